@@ -112,9 +112,9 @@ def run(job_id: str) -> RunResponse:
 
     runtime = out_ctx.get("_runtime") or {}
     hitl_tasks = runtime.get("hitl_tasks") or {}
-    for _, t in hitl_tasks.items():
+    for t in hitl_tasks.values():
         t["job_id"] = job_id
-        jobs.upsert_hitl_task(t)
+    jobs.upsert_hitl_tasks(list(hitl_tasks.values()))
 
     if sap_order_number:
         jobs.save_job_outputs(job_id, outputs, status="COMPLETED")
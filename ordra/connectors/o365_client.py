@@ -3,8 +3,10 @@ from __future__ import annotations
 import base64
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import requests
 
@@ -22,10 +24,11 @@ class O365Config:
     graph_base: str = "https://graph.microsoft.com/v1.0"
     token_url_base: str = "https://login.microsoftonline.com"
     timeout_seconds: int = 30
-    top: int = 25
+    top: int = 100  # Graph page size ($top); fewer round trips per search
+    attachment_workers: int = 8
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MessageCandidate:
     id: str
     internet_message_id: str
@@ -37,7 +40,7 @@ class MessageCandidate:
     body_preview: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AttachmentFile:
     name: str
     content_type: str
@@ -66,6 +69,43 @@ def load_config_from_env() -> O365Config:
     )
 
 
+class MessageSearch:
+    """
+    Iterable over message candidates, one Graph page at a time.
+    next_link is the @odata.nextLink of the last page fetched, and is only set once every
+    candidate of that page has been yielded (None if the caller stopped mid-page or the
+    results are exhausted), so resuming from it never skips candidates.
+    """
+
+    def __init__(
+        self, client: "O365Client", path: str, params: Dict[str, Any], subject_contains: List[str]
+    ) -> None:
+        self._client = client
+        self._path = path
+        self._params = params
+        self._subject_contains = subject_contains
+        self._page_link: Optional[str] = None
+        self._page_consumed = False
+
+    @property
+    def next_link(self) -> Optional[str]:
+        return self._page_link if self._page_consumed else None
+
+    def __iter__(self) -> Iterator[MessageCandidate]:
+        page = self._client._get(self._path, params=self._params)
+        while True:
+            self._page_link = page.get("@odata.nextLink")
+            candidates = self._client._parse_candidates(page.get("value", []), self._subject_contains)
+            self._page_consumed = not candidates
+            for i, c in enumerate(candidates, start=1):
+                if i == len(candidates):
+                    self._page_consumed = True
+                yield c
+            if not self._page_link:
+                return
+            page = self._client._get(self._page_link)
+
+
 class O365Client:
     """
     Microsoft Graph connector (App-only / Client Credentials).
@@ -139,11 +179,37 @@ class O365Client:
         subject_contains: Optional[List[str]] = None,
         has_attachments: Optional[bool] = True,
         received_after_iso: Optional[str] = None,  # e.g. 2026-02-01T00:00:00Z
-        max_results: int = 25,
+        max_results: int = 100,
+        page_size: Optional[int] = None,
     ) -> List[MessageCandidate]:
         """
         Deterministic mailbox search using $filter.
         Note: Graph restricts mixing $search and complex $filter; we avoid $search here.
+        page_size overrides cfg.top for the $top of each Graph page.
+        """
+        search = self.iter_messages(
+            folder=folder,
+            from_addresses=from_addresses,
+            subject_contains=subject_contains,
+            has_attachments=has_attachments,
+            received_after_iso=received_after_iso,
+            page_size=min(max_results, page_size or self.cfg.top),
+        )
+        return list(islice(search, max_results))
+
+    def iter_messages(
+        self,
+        *,
+        folder: str = "Inbox",
+        from_addresses: Optional[List[str]] = None,
+        subject_contains: Optional[List[str]] = None,
+        has_attachments: Optional[bool] = True,
+        received_after_iso: Optional[str] = None,
+        page_size: Optional[int] = None,
+    ) -> "MessageSearch":
+        """
+        Lazy variant of search_messages: pages are requested only as iteration advances,
+        following @odata.nextLink. The returned MessageSearch exposes next_link.
         """
         from_addresses = from_addresses or []
         subject_contains = subject_contains or []
@@ -174,7 +240,7 @@ class O365Client:
         ]
         params = {
             "$select": ",".join(select_fields),
-            "$top": min(max_results, self.cfg.top),
+            "$top": page_size or self.cfg.top,
             "$orderby": "receivedDateTime desc",
         }
         if filter_expr:
@@ -183,19 +249,7 @@ class O365Client:
         # Folder endpoint
         folder_id = self.get_folder_id(folder)
         path = f"/users/{self.cfg.mailbox}/mailFolders/{folder_id}/messages"
-
-        out: List[MessageCandidate] = []
-        page = self._get(path, params=params)
-        out.extend(self._parse_candidates(page.get("value", []), subject_contains))
-
-        # Pagination
-        while page.get("@odata.nextLink") and len(out) < max_results:
-            page = self._get(page["@odata.nextLink"])
-            out.extend(self._parse_candidates(page.get("value", []), subject_contains))
-            if len(out) >= max_results:
-                break
-
-        return out[:max_results]
+        return MessageSearch(self, path, params, subject_contains)
 
     def _parse_candidates(self, rows: List[Dict[str, Any]], subject_contains: List[str]) -> List[MessageCandidate]:
         out = []
@@ -254,6 +308,32 @@ class O365Client:
         path = f"/users/{self.cfg.mailbox}/messages/{message_id}/attachments"
         return self._get(path).get("value", [])
 
+    def get_attachment(self, message_id: str, attachment_id: str) -> Dict[str, Any]:
+        path = f"/users/{self.cfg.mailbox}/messages/{message_id}/attachments/{attachment_id}"
+        return self._get(path)
+
+    def _fill_missing_content(self, message_id: str, att: List[Dict[str, Any]]) -> None:
+        """
+        Fetch attachments that were listed without inline contentBytes, concurrently.
+        Network-bound, so a small thread pool gives ~N-fold wall-clock savings.
+        """
+        missing = [a for a in att if not a.get("contentBytes") and a.get("id")]
+        if not missing:
+            return
+        self._get_token()  # refresh once up front rather than racing in the workers
+
+        def _fetch(a: Dict[str, Any]) -> Optional[str]:
+            try:
+                return self.get_attachment(message_id, a["id"]).get("contentBytes")
+            except O365Error:
+                return None
+
+        workers = max(1, min(self.cfg.attachment_workers, len(missing)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for a, b64 in zip(missing, pool.map(_fetch, missing)):
+                if b64:
+                    a["contentBytes"] = b64
+
     def download_file_attachments(
         self,
         message_id: str,
@@ -265,6 +345,8 @@ class O365Client:
     ) -> List[AttachmentFile]:
         """
         Graph returns fileAttachment content in 'contentBytes' (base64) in attachment list.
+        max_files and max_total_bytes are applied to the listing (Graph's 'size') before any
+        missing content is fetched; decoded sizes are re-checked against the byte budget.
         """
         allowed_content_types = allowed_content_types or [
             "application/pdf",
@@ -274,22 +356,29 @@ class O365Client:
         ]
         allowed_name_exts = allowed_name_exts or [".pdf", ".xlsx", ".xls", ".csv"]
 
-        att = self.list_attachments(message_id)
+        att = [
+            a for a in self.list_attachments(message_id)
+            if a.get("@odata.type") == "#microsoft.graph.fileAttachment"
+            and (
+                (a.get("contentType") or "").strip() in allowed_content_types
+                or any((a.get("name") or "").strip().lower().endswith(ext) for ext in allowed_name_exts)
+            )
+        ]
+        # Cut to the limits first so oversized or surplus attachments are never downloaded.
+        listed_total = 0
+        for n, a in enumerate(att):
+            listed_total += int(a.get("size") or 0)
+            if n >= max_files or listed_total > max_total_bytes:
+                att = att[:n]
+                break
+        self._fill_missing_content(message_id, att)
         files: List[AttachmentFile] = []
         total = 0
 
         for a in att:
-            if len(files) >= max_files:
-                break
-            if a.get("@odata.type") != "#microsoft.graph.fileAttachment":
-                continue
-
             name = (a.get("name") or "").strip()
             ctype = (a.get("contentType") or "").strip()
 
-            if ctype not in allowed_content_types and not any(name.lower().endswith(ext) for ext in allowed_name_exts):
-                continue
-
             b64 = a.get("contentBytes")
             if not b64:
                 continue
@@ -3,12 +3,18 @@ from __future__ import annotations
 import json
 import sqlite3
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Generator, Optional
 
+try:
+    import orjson
+except ImportError:  # optional C accelerator; stdlib json is the fallback
+    orjson = None
+
 
 def _utc_iso() -> str:
-    return datetime.utcnow().isoformat()
+    # Fixed-width and tz-aware so rows from every writer sort as strings.
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
 
 
 class SQLiteDB:
@@ -21,13 +27,24 @@ class SQLiteDB:
     def __init__(self, db_path: str = "ordra.db") -> None:
         self.db_path = db_path
 
-    @contextmanager
-    def connect(self) -> Generator[sqlite3.Connection, None, None]:
+    def open(self) -> sqlite3.Connection:
+        """
+        Opens a configured connection the caller owns (and must close).
+        """
         conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row
         try:
             conn.execute("PRAGMA journal_mode=WAL;")
             conn.execute("PRAGMA synchronous=NORMAL;")
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    @contextmanager
+    def connect(self) -> Generator[sqlite3.Connection, None, None]:
+        conn = self.open()
+        try:
             yield conn
             conn.commit()
         except Exception:
@@ -75,8 +92,16 @@ class SQLiteDB:
                 );
                 """
             )
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_hitl_job ON hitl_tasks(job_id);")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_hitl_status ON hitl_tasks(status);")
+            # Composite indexes serve the latest-APPROVED lookup per job and the OPEN
+            # task list without a sort; they replace the single-column ones (same prefix),
+            # which existing databases drop here on the next init().
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_hitl_job_status_updated "
+                "ON hitl_tasks(job_id, status, updated_at DESC);"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_hitl_status_created ON hitl_tasks(status, created_at DESC);")
+            conn.execute("DROP INDEX IF EXISTS idx_hitl_job;")
+            conn.execute("DROP INDEX IF EXISTS idx_hitl_status;")
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS episodes (
@@ -112,13 +137,24 @@ class SQLiteDB:
 
     @staticmethod
     def dumps(obj: Any) -> str:
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+            except orjson.JSONEncodeError:
+                pass  # NaN/huge ints/unsupported types: let stdlib decide
         return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
 
     @staticmethod
     def loads(s: Optional[str]) -> Any:
         if s is None:
             return None
+        if orjson is not None:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass  # e.g. NaN written by stdlib json
         return json.loads(s)
 
-    def now(self) -> str:
+    @staticmethod
+    def now() -> str:
         return _utc_iso()
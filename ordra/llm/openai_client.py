@@ -76,6 +76,11 @@ class OpenAIClient:
         self.schemas_dir = Path(schemas_dir)
         self.skill_loader = SkillLoader(skills_dir=skills_dir) if skills_dir else SkillLoader()
 
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "OpenAIClient":
+        # Shared runtime service: the executor's per-wave ctx snapshots must not clone it
+        # (compiled jinja templates cannot be deep-copied).
+        return self
+
     def extract_po_schema(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """
         Render extract_po.j2 and validate against extracted_order.schema.json.
@@ -114,7 +119,7 @@ class OpenAIClient:
     def refine_po_schema(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """
         Refines extracted_order based on verifier critique.
-        Expects inputs: original_extracted_order + critique + same context fields used in extraction.
+        Expects inputs: original_extracted_order_json + critique + same context fields used in extraction.
         """
         schema_path = self.schemas_dir / "extracted_order.schema.json"
         schema = _load_json_schema(str(schema_path))
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional
 
 import networkx as nx
 import yaml
@@ -60,12 +60,14 @@ def load_dag_spec(path: str) -> Dict[str, Any]:
     return spec
 
 
-def build_graph_from_yaml(path: str) -> nx.DiGraph:
+def build_graph_from_yaml(path: str, opcodes: Optional[Mapping[str, int]] = None) -> nx.DiGraph:
     """
     Build a NetworkX DiGraph from YAML spec.
 
     Each node in graph has metadata:
       - type, handler, when, retry, timeout_seconds, outputs
+      - opcode: index into the executor's handler table when `opcodes` is given
+        (-1 for handler names it does not know)
     Edges are created from deps -> node_id
     """
     spec = load_dag_spec(path)
@@ -115,7 +117,10 @@ def build_graph_from_yaml(path: str) -> nx.DiGraph:
             outputs=[str(o) for o in outputs],
         )
 
-        g.add_node(node_id, spec=node_spec)
+        if opcodes is None:
+            g.add_node(node_id, spec=node_spec)
+        else:
+            g.add_node(node_id, spec=node_spec, opcode=opcodes.get(node_spec.handler, -1))
 
     for node_id in list(g.nodes):
         node_spec: NodeSpec = g.nodes[node_id]["spec"]
@@ -3,7 +3,7 @@ from __future__ import annotations
 import copy
 import time
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
 
 import networkx as nx
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -117,8 +117,12 @@ class ParallelDAGExecutor:
         *,
         max_workers: int = 6,
         enable_wave_parallelism: bool = True,
+        handler_table: Optional[Sequence[Callable[[Dict[str, Any], NodeSpec], Dict[str, Any]]]] = None,
     ):
+        # handler_table is indexed by the node 'opcode' that build_graph_from_yaml(opcodes=...)
+        # assigns; nodes without a valid opcode fall back to the name lookup in handlers.
         self.handlers = handlers
+        self.handler_table = handler_table
         self.max_workers = max_workers
         self.enable_wave_parallelism = enable_wave_parallelism
 
@@ -184,7 +188,11 @@ class ParallelDAGExecutor:
         if spec.when and not _eval_when_expr(spec.when, ctx_for_node):
             return NodeRunResult(node_id=node_id, ok=True, updates={}, attempts=0, duration_s=0.0)
 
-        handler = self.handlers.get(spec.handler)
+        opcode = node_data.get("opcode", -1)
+        if self.handler_table is not None and opcode >= 0:
+            handler = self.handler_table[opcode]
+        else:
+            handler = self.handlers.get(spec.handler)
         if not handler:
             raise ValueError(f"No handler registered for {spec.handler}")
 
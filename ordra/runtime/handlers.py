@@ -1,32 +1,209 @@
 from __future__ import annotations
 
 import json
-import uuid
-from datetime import datetime
+import os
+import secrets
+import shutil
+import tempfile
+import threading
+from dataclasses import fields
+from functools import lru_cache
+from itertools import islice
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, Callable, Dict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
 
 from ordra.agents.decision_verifier import DecisionVerifier
 from ordra.agents.verifier_agent import GeminiVerifier
-from ordra.connectors.o365_client import O365Client, O365Error
+from ordra.connectors.o365_client import MessageCandidate, O365Client, O365Error
+from ordra.db.sqlite import SQLiteDB
 from ordra.llm.openai_client import OpenAIClient, LLMError
 from ordra.memory.episodic import EpisodicMemoryStore
 from ordra.identity.customer_resolver import CustomerIdentityResolver
 from ordra.orchestration.dag_spec import NodeSpec
-from ordra.sap.sap_client import SapClient, map_to_bapi_createfromdat2
+from ordra.sap.sap_client import SapClient, SapResult, map_to_bapi_createfromdat2
+from ordra.sap.validation import SapValidator
 from ordra.orchestration.executor import TransientError
 
+try:
+    import orjson
+except ImportError:  # optional C accelerator; stdlib json is the fallback
+    orjson = None
+
 _ORDRA_ROOT = Path(__file__).resolve().parent.parent
 
+# Config files ship with the package and are treated as static for the process lifetime.
+_PRICING_PATH = str(_ORDRA_ROOT / "pricing" / "confidence_pricing.yaml")
+_POLICY_PATH = str(_ORDRA_ROOT / "policies" / "order_policies.yaml")
+_TRUST_PATH = str(_ORDRA_ROOT / "trust" / "customer_trust.yaml")
+_DECAY_PATH = str(_ORDRA_ROOT / "trust" / "trust_decay.yaml")
+_PRICING_EXISTS = Path(_PRICING_PATH).is_file()
+_POLICY_EXISTS = Path(_POLICY_PATH).is_file()
+
+class RuntimeBundle(NamedTuple):
+    """Per-job runtime objects, installed by run_job at ctx['_rt'] next to the ctx['_runtime'] dict."""
+
+    openai_client: Optional[OpenAIClient] = None
+    verifier: Optional[GeminiVerifier] = None
+    episode_store: Optional[EpisodicMemoryStore] = None
+    db: Optional[SQLiteDB] = None
+    hitl_tasks: Optional[Dict[str, Any]] = None
+    model_extractor: Optional[str] = None
+    model_verifier: Optional[str] = None
+    o365_client: Optional[O365Client] = None
+    sap_client: Optional[SapClient] = None
+    sap_validator: Optional[SapValidator] = None
+    spool_dir: Optional[str] = None
+
+
+def runtime_bundle(runtime: Mapping[str, Any]) -> RuntimeBundle:
+    """Build a RuntimeBundle from a '_runtime'-style dict (unknown keys are ignored)."""
+    names = RuntimeBundle._fields
+    return RuntimeBundle(**{k: v for k, v in runtime.items() if k in names})
+
+
+_NO_RUNTIME = RuntimeBundle()
+
+
+def _rt(ctx: Dict[str, Any]) -> RuntimeBundle:
+    """ctx['_rt'] as installed by run_job (ad-hoc callers build it with runtime_bundle())."""
+    rt = ctx.get("_rt")
+    return _NO_RUNTIME if rt is None else rt
+
+
+# Fixed decision outcomes, built once; handlers copy them via _decision_from().
+_DEC_UNKNOWN_SENDER = MappingProxyType({
+    "action": "CS_REVIEW",
+    "safe_to_post": False,
+    "confidence_overall": 0.5,
+    "reasons": ("Unknown sender – customer not in identity config",),
+    "required_human_role": "CS",
+})
+_DEC_POLICY_BLOCK = MappingProxyType({
+    "action": "CS_REVIEW",
+    "safe_to_post": False,
+    "confidence_overall": 0.70,
+    "reasons": (),
+    "required_human_role": "CS",
+})
+_DEC_CREDIT_BLOCKED = MappingProxyType({
+    "action": "HOLD",
+    "safe_to_post": False,
+    "confidence_overall": 0.70,
+    "reasons": ("Credit blocked",),
+    "required_human_role": "FINANCE",
+})
+_DEC_CREDIT_UNVALIDATED = MappingProxyType({
+    "action": "CS_REVIEW",
+    "safe_to_post": False,
+    "confidence_overall": 0.70,
+    "reasons": ("Credit not validated",),
+    "required_human_role": "CS",
+})
+_DEC_MISSING_CORE = MappingProxyType({
+    "action": "ASK_CUSTOMER",
+    "safe_to_post": False,
+    "confidence_overall": 0.60,
+    "reasons": ("Missing mandatory fields",),
+    "required_human_role": "CS",
+})
+_DEC_UNMAPPED = MappingProxyType({
+    "action": "CS_REVIEW",
+    "safe_to_post": False,
+    "confidence_overall": 0.75,
+    "reasons": ("Unmapped material(s)",),
+    "required_human_role": "CS",
+})
+_DEC_LOW_TRUST = MappingProxyType({
+    "action": "CS_REVIEW",
+    "safe_to_post": False,
+    "confidence_overall": 0.75,
+    "reasons": (),
+    "required_human_role": "CS",
+})
+_DEC_AUTO_POST = MappingProxyType({
+    "action": "AUTO_POST",
+    "safe_to_post": True,
+    "confidence_overall": 0.92,
+    "reasons": ("All validations passed; safe-to-post satisfied",),
+    "required_human_role": None,
+})
+
+# Fixed validation issues, built once; handlers copy them via _issue_from().
+_ISSUE_CUST_MISSING = MappingProxyType({
+    "code": "CUST_MISSING",
+    "severity": "critical",
+    "message": "Sold-to missing",
+    "recommended_action": "Request customer details",
+    "related_fields": ("sold_to",),
+})
+_ISSUE_SHIPTO_MISSING = MappingProxyType({
+    "code": "SHIPTO_MISSING",
+    "severity": "warn",
+    "message": "Ship-to missing",
+    "recommended_action": "Derive or request ship-to",
+    "related_fields": ("ship_to",),
+})
+_ISSUE_CREDIT_BLOCK = MappingProxyType({
+    "code": "CREDIT_BLOCK",
+    "severity": "critical",
+    "message": "Credit blocked",
+    "recommended_action": "Finance approval required",
+    "related_fields": (),
+})
+_ISSUE_ATP_SHORT = MappingProxyType({
+    "code": "ATP_SHORT",
+    "severity": "warn",
+    "message": "ATP short",
+    "recommended_action": "CS review: partial/backorder",
+    "related_fields": (),
+})
+
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+def _val(d: Mapping[str, Any], key: str) -> Any:
+    """`(d.get(key) or {}).get("value")` without allocating a dict on every miss."""
+    return (d.get(key) or _EMPTY).get("value")
+
+
+def _decision_from(proto: Mapping[str, Any], reasons: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Mutable copy of a decision prototype (downstream verifiers append to reasons)."""
+    decision = dict(proto)
+    decision["reasons"] = list(proto["reasons"] if reasons is None else reasons)
+    return decision
+
+
+def _issue_from(proto: Mapping[str, Any]) -> Dict[str, Any]:
+    issue = dict(proto)
+    issue["related_fields"] = list(proto["related_fields"])
+    return issue
+
+
+def _dumps(obj: Any, *, indent: bool = False, sort_keys: bool = False) -> str:
+    """JSON text via orjson when installed; sort_keys gives a canonical form for cache keys."""
+    if orjson is not None:
+        option = (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, option=option).decode()
+        except orjson.JSONEncodeError:
+            pass  # e.g. ints beyond 64 bits or non-str keys; stdlib handles them
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False, sort_keys=sort_keys)
+    return json.dumps(obj, ensure_ascii=False, sort_keys=sort_keys, separators=(",", ":"))
+
 
 def _now_iso() -> str:
-    return datetime.utcnow().isoformat()
+    # Same format as JobService rows: hitl_tasks/revenue_events take timestamps from both.
+    return SQLiteDB.now()
 
 
 def _ensure_job_id(ctx: Dict[str, Any]) -> str:
     job_id = ctx.get("job_id")
     if not job_id:
-        job_id = f"J-{uuid.uuid4().hex[:10]}"
+        job_id = f"J-{secrets.token_hex(5)}"
         ctx["job_id"] = job_id
     return job_id
 
@@ -125,26 +302,14 @@ def agents_decision_agent(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]
     intake = ctx.get("intake_context") or {}
     # Guardrail: never AUTO_POST for unknown senders
     if intake.get("customer_candidate") == "UNKNOWN":
-        decision = {
-            "action": "CS_REVIEW",
-            "safe_to_post": False,
-            "confidence_overall": 0.5,
-            "reasons": ["Unknown sender – customer not in identity config"],
-            "required_human_role": "CS",
-        }
+        decision = _decision_from(_DEC_UNKNOWN_SENDER)
         return {"decision": decision, "hitl_task": _make_hitl_payload(ctx, decision)}
 
     trust_tier = intake.get("trust_tier_override") or ctx.get("trust_tier") or "BRONZE"
 
     if any(v.get("severity") == "hard_block" for v in policy_violations):
         reasons = [v.get("reason", "Policy violation") for v in policy_violations if v.get("severity") == "hard_block"]
-        decision = {
-            "action": "CS_REVIEW",
-            "safe_to_post": False,
-            "confidence_overall": 0.70,
-            "reasons": reasons,
-            "required_human_role": "CS",
-        }
+        decision = _decision_from(_DEC_POLICY_BLOCK, reasons)
         return {"decision": decision, "hitl_task": _make_hitl_payload(ctx, decision)}
 
     extracted = validated.get("extracted") or {}
@@ -164,50 +329,20 @@ def agents_decision_agent(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]
     has_unmapped = any(v in (None, "", "UNMAPPED") for v in mapped_materials.values()) if mapped_materials else True
     credit_ok = validated.get("credit_ok")
     if credit_ok is not True:
-        decision = {
-            "action": "HOLD" if credit_ok is False else "CS_REVIEW",
-            "safe_to_post": False,
-            "confidence_overall": 0.70,
-            "reasons": ["Credit blocked" if credit_ok is False else "Credit not validated"],
-            "required_human_role": "FINANCE" if credit_ok is False else "CS",
-        }
+        decision = _decision_from(_DEC_CREDIT_BLOCKED if credit_ok is False else _DEC_CREDIT_UNVALIDATED)
         return {"decision": decision, "hitl_task": _make_hitl_payload(ctx, decision)}
     if missing_core:
-        decision = {
-            "action": "ASK_CUSTOMER",
-            "safe_to_post": False,
-            "confidence_overall": 0.60,
-            "reasons": ["Missing mandatory fields"],
-            "required_human_role": "CS",
-        }
+        decision = _decision_from(_DEC_MISSING_CORE)
         return {"decision": decision, "hitl_task": _make_hitl_payload(ctx, decision)}
     if has_unmapped:
-        decision = {
-            "action": "CS_REVIEW",
-            "safe_to_post": False,
-            "confidence_overall": 0.75,
-            "reasons": ["Unmapped material(s)"],
-            "required_human_role": "CS",
-        }
+        decision = _decision_from(_DEC_UNMAPPED)
         return {"decision": decision, "hitl_task": _make_hitl_payload(ctx, decision)}
 
     if trust_tier == "BRONZE":
-        decision = {
-            "action": "CS_REVIEW",
-            "safe_to_post": False,
-            "confidence_overall": 0.75,
-            "reasons": [f"Customer trust tier {trust_tier} – AUTO_POST not enabled"],
-            "required_human_role": "CS",
-        }
+        decision = _decision_from(_DEC_LOW_TRUST, [f"Customer trust tier {trust_tier} – AUTO_POST not enabled"])
         return {"decision": decision, "hitl_task": _make_hitl_payload(ctx, decision)}
 
-    decision = {
-        "action": "AUTO_POST",
-        "safe_to_post": True,
-        "confidence_overall": 0.92,
-        "reasons": ["All validations passed; safe-to-post satisfied"],
-        "required_human_role": None,
-    }
+    decision = _decision_from(_DEC_AUTO_POST)
     return {"decision": decision, "hitl_task": None}
 
 
@@ -219,11 +354,10 @@ def agents_audit_agent(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     customer_key = intake.get("customer_candidate") or "UNKNOWN"
     trust_tier = ctx.get("trust_tier") or "BRONZE"
 
-    pricing_path = str(_ORDRA_ROOT / "pricing" / "confidence_pricing.yaml")
     pricing_info = {"price": 0.0, "tier": "unknown"}
-    if Path(pricing_path).is_file():
+    if _PRICING_EXISTS:
         from ordra.pricing.calculator import ConfidencePricing
-        pricing = ConfidencePricing(pricing_path)
+        pricing = ConfidencePricing(_PRICING_PATH)
         pricing_info = pricing.price(confidence)
 
     now = _now_iso()
@@ -250,7 +384,7 @@ def agents_audit_agent(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
             "timestamp": now,
         },
     }
-    db = (ctx.get("_runtime") or {}).get("db")
+    db = _rt(ctx).db
     if db and hasattr(db, "connect"):
         try:
             with db.connect() as conn:
@@ -272,25 +406,65 @@ def agents_audit_agent(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     return {"audit_record": audit_record, "decision_deck": decision_deck}
 
 
-def _pdf_bytes_to_text(data: bytes) -> str:
-    try:
-        from io import BytesIO
-        from pypdf import PdfReader
-        r = PdfReader(BytesIO(data))
-        return "\n".join((page.extract_text() or "") for page in r.pages)
-    except Exception:
-        return ""
+# PDFium is not thread-safe; jobs run concurrently (API threads, parallel waves).
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _iter_pdfium_pages(data: Union[bytes, str]) -> Iterator[str]:
+    import pypdfium2 as pdfium
+    pages: List[str] = []
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(data)
+        try:
+            for i in range(len(pdf)):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+    # PDFium ends lines with \r\n; pypdf (the fallback, and the text before PDFium) uses \n.
+    for text in pages:
+        yield text.replace("\r\n", "\n")
+
+
+def _iter_pypdf_pages(data: Union[bytes, str]) -> Iterator[str]:
+    from io import BytesIO
+    from pypdf import PdfReader
+    for page in PdfReader(data if isinstance(data, str) else BytesIO(data)).pages:
+        yield page.extract_text() or ""
+
+
+def _pdf_bytes_to_pages(data: Union[bytes, str]) -> List[str]:
+    """
+    Per-page text, via PDFium (C++) when pypdfium2 is installed, else pypdf.
+    data is the PDF bytes or a file path (read by the library itself, no Python-side copy).
+    Pages are kept as separate chunks so the whole text is never joined here.
+    """
+    for iter_pages in (_iter_pdfium_pages, _iter_pypdf_pages):
+        try:
+            return list(iter_pages(data))
+        except Exception:
+            continue
+    return []
 
 
 def documents_pdf_text_extract(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     pdf_text = ctx.get("pdf_text") or ""
-    if not pdf_text and ctx.get("pdf_files"):
+    if pdf_text:
+        return {"pdf_text_chunks": [pdf_text]}
+    chunks: List[str] = []
+    if ctx.get("pdf_files"):
         first = ctx["pdf_files"][0]
-        raw = first.get("bytes") if isinstance(first, dict) else getattr(first, "bytes_data", None)
+        if isinstance(first, dict):
+            raw = first.get("bytes") or first.get("path")
+        else:
+            raw = getattr(first, "bytes_data", None)
         if raw:
-            pdf_text = _pdf_bytes_to_text(raw)
-    chunks = [pdf_text] if pdf_text else []
-    return {"pdf_text_chunks": chunks}
+            chunks = _pdf_bytes_to_pages(raw)
+    # Downstream "\n".join(pdf_text_chunks) matches the old single-string text.
+    return {"pdf_text_chunks": chunks if any(chunks) else []}
 
 
 def documents_ocr_run(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
@@ -321,8 +495,9 @@ def skills_retrieve_for_context(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str
     return {"skills_text": skills_text}
 
 
-def _get_episode_store(ctx: Dict[str, Any]):
-    return (ctx.get("_runtime") or {}).get("episode_store")
+def _get_episode_store(ctx: Dict[str, Any]) -> Optional[EpisodicMemoryStore]:
+    # run_job always installs an EpisodicMemoryStore (or None), so callers only None-check.
+    return _rt(ctx).episode_store
 
 
 def memory_episode_retrieve(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
@@ -334,7 +509,7 @@ def memory_episode_retrieve(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, An
     intake = ctx.get("intake_context") or {}
     customer = intake.get("customer_candidate") or "UNKNOWN"
     layout_hash = ctx.get("layout_hints") if ctx.get("layout_hints") else None
-    if not store or not isinstance(store, EpisodicMemoryStore):
+    if store is None:
         return {"episode_recipes": {"recipes": [], "recipes_text": ""}}
     result = store.retrieve_recipes(customer_key=customer, layout_hash=layout_hash, limit=5)
     return {"episode_recipes": result}
@@ -353,7 +528,7 @@ def memory_episode_retrieve_recipes(ctx: Dict[str, Any], spec: NodeSpec) -> Dict
 def memory_episode_save(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     """Persist episode skeleton after finalize_audit (EpisodicMemoryStore)."""
     store = _get_episode_store(ctx)
-    if not store or not isinstance(store, EpisodicMemoryStore):
+    if store is None:
         return {"episode_saved": {}}
     ep = store.save_episode(ctx)
     return {
@@ -365,13 +540,20 @@ def memory_episode_save(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     }
 
 
+@lru_cache(maxsize=128)
+def _eval_policies_cached(policy_path: str, facts_items: Tuple[Tuple[str, Any], ...]) -> Tuple[Dict[str, str], ...]:
+    """Same policy file + same facts -> same violations; callers copy the result."""
+    from ordra.policies.evaluator import PolicyEvaluator
+    return tuple(PolicyEvaluator(policy_path).evaluate(dict(facts_items)))
+
+
 def policies_evaluate(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     """Policy-as-code: evaluate order against YAML policies; output violations."""
-    policy_path = str(_ORDRA_ROOT / "policies" / "order_policies.yaml")
-    if not Path(policy_path).is_file():
+    validated = ctx.get("validated_order")
+    if not validated:
+        return {"policy_violations": []}
+    if not _POLICY_EXISTS:
         return {"policy_violations": []}
-    from ordra.policies.evaluator import PolicyEvaluator
-    validated = ctx.get("validated_order") or {}
     credit_ok = validated.get("credit_ok")
     facts = {
         "credit_status": "BLOCKED" if credit_ok is False else "OK",
@@ -381,9 +563,8 @@ def policies_evaluate(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
         "sanctioned_country": False,
         "material_trust_score": 0.9,
     }
-    evaluator = PolicyEvaluator(policy_path)
-    violations = evaluator.evaluate(facts)
-    return {"policy_violations": violations}
+    violations = _eval_policies_cached(_POLICY_PATH, tuple(sorted(facts.items())))
+    return {"policy_violations": [dict(v) for v in violations]}
 
 
 def trust_evaluate(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
@@ -391,13 +572,11 @@ def trust_evaluate(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     store = _get_episode_store(ctx)
     intake = ctx.get("intake_context") or {}
     customer_key = intake.get("customer_candidate") or "UNKNOWN"
-    if not store or not isinstance(store, EpisodicMemoryStore):
+    if store is None:
         return {"trust_tier": "BRONZE", "trust_clean_count": 0}
     try:
-        trust_path = str(_ORDRA_ROOT / "trust" / "customer_trust.yaml")
-        decay_path = str(_ORDRA_ROOT / "trust" / "trust_decay.yaml")
         from ordra.trust.evaluator import CustomerTrustEvaluator
-        evaluator = CustomerTrustEvaluator(trust_path, store, decay_path=decay_path)
+        evaluator = CustomerTrustEvaluator(_TRUST_PATH, store, decay_path=_DECAY_PATH)
         tier, clean_count = evaluator.evaluate(customer_key)
         return {"trust_tier": tier, "trust_clean_count": clean_count}
     except Exception:
@@ -409,7 +588,7 @@ def memory_faiss_resolve_aliases(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[st
 
 
 def llm_openai_extract_po_schema(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
-    client: OpenAIClient = ctx["_runtime"]["openai_client"]
+    client: OpenAIClient = _rt(ctx).openai_client
     email_body = (ctx.get("email_message") or {}).get("body") or ctx.get("email_body") or ""
     intake_context = ctx.get("intake_context") or {}
     customer_hint = intake_context.get("customer_candidate")
@@ -443,7 +622,7 @@ def agents_verifier_extraction(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str,
     Scores extraction quality with Gemini Flash-class verifier.
     Veto-only: can request refine or force HITL later.
     """
-    verifier: GeminiVerifier = ctx["_runtime"]["verifier"]
+    verifier: GeminiVerifier = _rt(ctx).verifier
     extracted = ctx.get("extracted_order") or {}
     customer = (ctx.get("intake_context") or {}).get("customer_candidate") or "UNKNOWN"
     query = "Extract purchase order fields into the required JSON schema."
@@ -467,17 +646,17 @@ def llm_openai_refine_po_schema(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str
     verdict = ctx.get("extraction_verdict") or {}
     if not verdict.get("needs_refine"):
         return {}
-    client: OpenAIClient = ctx["_runtime"]["openai_client"]
+    client: OpenAIClient = _rt(ctx).openai_client
     critique = verdict.get("critique") or ""
     extracted = ctx.get("extracted_order") or {}
     email_body = (ctx.get("email_message") or {}).get("body") or ctx.get("email_body") or ""
     pdf_text = "\n".join(ctx.get("pdf_text_chunks") or [])
     ocr_text = "\n".join(ctx.get("ocr_text_chunks") or [])
     excel_tables = ctx.get("excel_tables") or ""
+    # refine_po.j2 only reads the JSON text, so the raw dict is not passed along.
     inputs = {
         "critique": critique,
-        "original_extracted_order": extracted,
-        "original_extracted_order_json": json.dumps(extracted, indent=2),
+        "original_extracted_order_json": _dumps(extracted, indent=True),
         "email_body": email_body,
         "pdf_text": pdf_text,
         "ocr_text": ocr_text,
@@ -536,7 +715,7 @@ def verifier_verify_decision(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, A
     decision = ctx.get("decision") or {}
     if decision.get("action") != "AUTO_POST":
         return {}
-    client: OpenAIClient = ctx["_runtime"]["openai_client"]
+    client: OpenAIClient = _rt(ctx).openai_client
     validated = ctx.get("validated_order") or {}
     summary_parts = [
         f"issues_count={len(validated.get('issues') or [])}",
@@ -571,11 +750,11 @@ def sap_validate_customer(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]
         resolved["sold_to_id"] = "100234"
         resolved["payer_id"] = "100234"
     else:
-        issues.append({"code": "CUST_MISSING", "severity": "critical", "message": "Sold-to missing", "recommended_action": "Request customer details", "related_fields": ["sold_to"]})
+        issues.append(_issue_from(_ISSUE_CUST_MISSING))
     if ship_to_val:
         resolved["ship_to_id"] = "200987"
     else:
-        issues.append({"code": "SHIPTO_MISSING", "severity": "warn", "message": "Ship-to missing", "recommended_action": "Derive or request ship-to", "related_fields": ["ship_to"]})
+        issues.append(_issue_from(_ISSUE_SHIPTO_MISSING))
     return {"customer_validation": {"resolved_ids": resolved, "issues": issues}}
 
 
@@ -593,60 +772,50 @@ def sap_validate_materials(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any
     material_overrides = overrides.get("material_mappings") or {}
     norm_overrides: Dict[int, str] = {}
     if isinstance(material_overrides, dict):
-        for k, v in material_overrides.items():
-            try:
-                ln = int(k)
-                if isinstance(v, str) and v.strip():
-                    norm_overrides[ln] = v.strip()
-            except Exception:
-                continue
-    mapped_materials: Dict[int, Any] = {}
-    uom_ok: Dict[int, bool] = {}
-    issues = []
-    for li in line_items:
-        ln = int(li.get("line_no"))
-        cm = (li.get("customer_material") or {}).get("value")
-        if ln in norm_overrides:
-            mapped_materials[ln] = norm_overrides[ln]
-            uom_ok[ln] = True
-            continue
-        if cm:
-            mapped_materials[ln] = "0000098765"
-            uom_ok[ln] = True
-        else:
-            mapped_materials[ln] = None
-            uom_ok[ln] = False
-            issues.append({
-                "code": "MAT_UNMAPPED",
-                "severity": "critical",
-                "message": f"Unmapped material at line {ln}",
-                "recommended_action": "CS to map customer material",
-                "related_fields": [f"line_items[{ln}].customer_material"]
-            })
+        norm_overrides = {
+            int(k): v.strip()
+            for k, v in material_overrides.items()
+            if isinstance(k, (str, int)) and str(k).strip().isdecimal()
+            and isinstance(v, str) and v.strip()
+        }
+    lines = [(int(li.get("line_no")), (li.get("customer_material") or {}).get("value")) for li in line_items]
+    mapped_materials: Dict[int, Any] = {
+        ln: norm_overrides.get(ln) or ("0000098765" if cm else None) for ln, cm in lines
+    }
+    uom_ok: Dict[int, bool] = {ln: ln in norm_overrides or bool(cm) for ln, cm in lines}
+    issues = [
+        {
+            "code": "MAT_UNMAPPED",
+            "severity": "critical",
+            "message": f"Unmapped material at line {ln}",
+            "recommended_action": "CS to map customer material",
+            "related_fields": [f"line_items[{ln}].customer_material"]
+        }
+        for ln, cm in lines
+        if ln not in norm_overrides and not cm
+    ]
     return {"material_validation": {"mapped_materials": mapped_materials, "uom_ok": uom_ok, "issues": issues}}
 
 
 def sap_validate_pricing(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     ex = ctx.get("extracted_order") or {}
     line_items = ex.get("line_items") or []
-    pricing_ok = {}
-    for li in line_items:
-        ln = int(li.get("line_no"))
-        pricing_ok[ln] = True
+    # Keyed by the line numbers themselves: they are not guaranteed to be 1..n.
+    pricing_ok = dict.fromkeys((int(li.get("line_no")) for li in line_items), True)
     return {"pricing_validation": {"pricing_ok": pricing_ok, "issues": []}}
 
 
 def sap_validate_credit(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     forced = ctx.get("force_credit_block")
     if forced:
-        return {"credit_validation": {"credit_ok": False, "issues": [{"code": "CREDIT_BLOCK", "severity": "critical", "message": "Credit blocked", "recommended_action": "Finance approval required", "related_fields": []}]}}
+        return {"credit_validation": {"credit_ok": False, "issues": [_issue_from(_ISSUE_CREDIT_BLOCK)]}}
     return {"credit_validation": {"credit_ok": True, "issues": []}}
 
 
 def sap_validate_atp(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     forced = ctx.get("force_atp_short")
     if forced:
-        return {"atp_validation": {"atp_ok": False, "derived_plant": "IN01", "derived_route": "ROAD", "issues": [{"code": "ATP_SHORT", "severity": "warn", "message": "ATP short", "recommended_action": "CS review: partial/backorder", "related_fields": []}]}}
+        return {"atp_validation": {"atp_ok": False, "derived_plant": "IN01", "derived_route": "ROAD", "issues": [_issue_from(_ISSUE_ATP_SHORT)]}}
     return {"atp_validation": {"atp_ok": True, "derived_plant": "IN01", "derived_route": "ROAD", "issues": []}}
 
 
@@ -659,11 +828,12 @@ def _build_sap_order_payload(ctx: Dict[str, Any]) -> Dict[str, Any]:
     resolved = cust.get("resolved_ids") or {}
     materials = (ctx.get("material_validation") or {}).get("mapped_materials") or {}
     atp = ctx.get("atp_validation") or {}
+    val = _val
 
-    sold_to = intake.get("sold_to") or resolved.get("sold_to_id") or (extracted.get("sold_to") or {}).get("value")
-    ship_to = intake.get("ship_to") or resolved.get("ship_to_id") or (extracted.get("ship_to") or {}).get("value")
-    po_number = (extracted.get("po_number") or {}).get("value")
-    req_delivery_date = (extracted.get("requested_delivery_date") or {}).get("value") or ""
+    sold_to = intake.get("sold_to") or resolved.get("sold_to_id") or val(extracted, "sold_to")
+    ship_to = intake.get("ship_to") or resolved.get("ship_to_id") or val(extracted, "ship_to")
+    po_number = val(extracted, "po_number")
+    req_delivery_date = val(extracted, "requested_delivery_date") or ""
 
     sold_to = str(sold_to or "")[:10]
     ship_to = str(ship_to or "")[:10]
@@ -674,13 +844,13 @@ def _build_sap_order_payload(ctx: Dict[str, Any]) -> Dict[str, Any]:
         ln = int(li.get("line_no", 0))
         mat = materials.get(ln)
         if mat is None:
-            mat = (li.get("customer_material") or {}).get("value")
-        qty_val = (li.get("quantity") or {}).get("value")
+            mat = val(li, "customer_material")
+        qty_val = val(li, "quantity")
         try:
             qty = float(qty_val) if qty_val is not None else 0
         except (TypeError, ValueError):
             qty = 0
-        line_req = (li.get("requested_delivery_date") or {}).get("value") or req_delivery_date
+        line_req = val(li, "requested_delivery_date") or req_delivery_date
         items.append({
             "material": str(mat or "")[:18],
             "plant": plant_default,
@@ -703,6 +873,7 @@ def _build_sap_order_payload(ctx: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def _make_extracted_bapi(bapi_payload: Dict[str, Any], ctx: Dict[str, Any]) -> Dict[str, Any]:
+    # Shallow: the BAPI tables are shared with bapi_payload, not copied.
     email_msg = ctx.get("email_message") or {}
     return {
         **bapi_payload,
@@ -722,8 +893,21 @@ def sap_build_bapi_preview(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any
     return {"extracted_bapi": extracted_bapi, "sap_bapi_payload": bapi_payload}
 
 
+def _sap_order_result(res: SapResult) -> Dict[str, Any]:
+    if res.ok:
+        return {
+            "sap_order_number": res.sales_order,
+            "sap_post_raw": res.raw,
+        }
+    return {
+        "sap_order_number": None,
+        "sap_post_error": res.error,
+        "sap_post_raw": res.raw,
+    }
+
+
 def sap_create_sales_order(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
-    client = (ctx.get("_runtime") or {}).get("sap_client")
+    client = _rt(ctx).sap_client
     if not client or not isinstance(client, SapClient):
         return {"sap_order_result": {"sap_order_number": None, "sap_post_error": "sap_client not available"}}
 
@@ -731,35 +915,25 @@ def sap_create_sales_order(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any
     if not payload:
         payload = _build_sap_order_payload(ctx)
 
-    bapi_payload = map_to_bapi_createfromdat2(payload)
-    email_msg = ctx.get("email_message") or {}
-    extracted_bapi = _make_extracted_bapi(bapi_payload, ctx)
+    # Stub posting never sends the BAPI structure; sap.build_bapi_preview already
+    # provides extracted_bapi/sap_bapi_payload, so only map when it matters. The one
+    # mapping is shared by the RFC call and both outputs.
+    bapi_payload = None
+    if client.mode != "stub" or ctx.get("emit_bapi_preview"):
+        bapi_payload = map_to_bapi_createfromdat2(payload)
 
-    res = client.create_sales_order(payload)
-    if res.ok:
-        return {
-            "sap_order_result": {
-                "sap_order_number": res.sales_order,
-                "sap_post_raw": res.raw,
-            },
-            "extracted_bapi": extracted_bapi,
-            "sap_bapi_payload": bapi_payload,
-        }
-    return {
-        "sap_order_result": {
-            "sap_order_number": None,
-            "sap_post_error": res.error,
-            "sap_post_raw": res.raw,
-        },
-        "extracted_bapi": extracted_bapi,
-        "sap_bapi_payload": bapi_payload,
-    }
+    res = client.create_sales_order(payload, bapi_in=bapi_payload)
+    out = {"sap_order_result": _sap_order_result(res)}
+    if bapi_payload is not None:
+        out["extracted_bapi"] = _make_extracted_bapi(bapi_payload, ctx)
+        out["sap_bapi_payload"] = bapi_payload
+    return out
 
 
 def hitl_create_task_if_needed(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     decision = ctx.get("decision") or {}
     job_id = _ensure_job_id(ctx)
-    task_id = f"T-{uuid.uuid4().hex[:10]}"
+    task_id = f"T-{secrets.token_hex(5)}"
     payload = ctx.get("hitl_task") or {
         "job_id": job_id,
         "decision": decision,
@@ -769,45 +943,91 @@ def hitl_create_task_if_needed(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str,
             "material_mappings": {}
         }
     }
-    tasks = ctx["_runtime"].setdefault("hitl_tasks", {})
-    tasks[task_id] = {
-        "task_id": task_id,
-        "job_id": job_id,
-        "created_at": _now_iso(),
-        "status": "OPEN",
-        "role": decision.get("required_human_role") or "CS",
-        "payload": payload,
-    }
+    tasks = _rt(ctx).hitl_tasks
+    if tasks is not None:
+        tasks[task_id] = {
+            "task_id": task_id,
+            "job_id": job_id,
+            "created_at": _now_iso(),
+            "status": "OPEN",
+            "role": decision.get("required_human_role") or "CS",
+            "payload": payload,
+        }
     return {"hitl_task_id": task_id}
 
 
+def _stripped_len(text: str, window: int = 64) -> int:
+    """len(text.strip()) without copying large texts: only the edges are scanned."""
+    n = len(text)
+    if n <= 2 * window:
+        return len(text.strip())
+    lead = window - len(text[:window].lstrip())
+    trail = window - len(text[-window:].rstrip())
+    if lead == window or trail == window:
+        return len(text.strip())
+    return n - lead - trail
+
+
+# (takes OCR path, text under 20 chars) -> (doc_quality, preprocess_plan)
+_QUALITY_TABLE: Dict[Tuple[bool, bool], Tuple[str, Tuple[str, ...]]] = {
+    (False, False): ("digital", ("pdf_text_extract",)),
+    (False, True): ("digital", ("pdf_text_extract",)),
+    (True, False): ("scanned_good", ("ocr_fast",)),
+    (True, True): ("scanned_poor", ("ocr_strong", "table_extractor")),
+}
+
+
 def documents_doc_quality_router(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     """
     Document quality classifier: digital vs scanned_good vs scanned_poor.
     Sets doc_quality and preprocess_plan for downstream OCR branching.
     MVP: heuristic from text length and whether OCR path was requested.
     """
-    pdf_text = ctx.get("pdf_text") or ""
-    has_ocr = bool(ctx.get("ocr_text"))
-    pdf_len = len(pdf_text.strip())
-    if has_ocr or (pdf_len < 50 and ctx.get("has_pdf_attachment")):
-        doc_quality = "scanned_poor" if pdf_len < 20 else "scanned_good"
-        preprocess_plan = ["ocr_fast"] if pdf_len >= 20 else ["ocr_strong", "table_extractor"]
-    else:
-        doc_quality = "digital"
-        preprocess_plan = ["pdf_text_extract"]
+    pdf_len = _stripped_len(ctx.get("pdf_text") or "")
+    ocr_path = bool(ctx.get("ocr_text")) or (pdf_len < 50 and bool(ctx.get("has_pdf_attachment")))
+    doc_quality, preprocess_plan = _QUALITY_TABLE[(ocr_path, pdf_len < 20)]
     return {
         "doc_quality": doc_quality,
-        "preprocess_plan": preprocess_plan,
+        "preprocess_plan": list(preprocess_plan),
     }
 
 
+_IDENTITY_PATH = _ORDRA_ROOT / "config" / "customer_identity.yaml"
+
+
+def _identity_mtime() -> int:
+    try:
+        return _IDENTITY_PATH.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+_RESOLVER = CustomerIdentityResolver()
+_RESOLVER_MTIME = _identity_mtime()
+
+
+@lru_cache(maxsize=4096)
+def _resolve_sender(sender_lower: str) -> Optional[Dict[str, Any]]:
+    """Senders recur across emails; callers must not mutate the returned dict."""
+    return _RESOLVER.resolve(sender_lower)
+
+
+def _reload_resolver_if_changed() -> None:
+    """Rebuild the resolver and drop memoized lookups when customer_identity.yaml changes."""
+    global _RESOLVER, _RESOLVER_MTIME
+    mtime = _identity_mtime()
+    if mtime != _RESOLVER_MTIME:
+        _RESOLVER = CustomerIdentityResolver()
+        _RESOLVER_MTIME = mtime
+        _resolve_sender.cache_clear()
+
+
 def identity_resolve_customer(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     """Resolve sender email to customer_key and SAP sold-to/ship-to from config."""
-    resolver = CustomerIdentityResolver()
+    _reload_resolver_if_changed()
     email = ctx.get("email_message") or {}
-    sender = email.get("from")
-    resolved = resolver.resolve(sender)
+    sender = (email.get("from") or "").strip().lower()
+    resolved = _resolve_sender(sender) if sender else None
 
     if not resolved:
         return {
@@ -832,11 +1052,20 @@ def identity_resolve_customer(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str,
     return {"intake_context": out}
 
 
+# Fixed output schema for email_candidates (all MessageCandidate fields, declaration order).
+_CANDIDATE_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(MessageCandidate))
+_candidate_values = attrgetter(*_CANDIDATE_FIELDS)
+
+
 def mailbox_o365_search(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
-    """Uses deterministic filters; returns candidates. Expects ctx['mailbox_query'] optionally."""
-    client = (ctx.get("_runtime") or {}).get("o365_client")
+    """
+    Uses deterministic filters; returns candidates. Expects ctx['mailbox_query'] optionally.
+    Only the top candidate is fetched unless mailbox_query.return_all is set; next_link lets
+    callers resume Graph pagination later.
+    """
+    client = _rt(ctx).o365_client
     if not client or not isinstance(client, O365Client):
-        return {"email_candidates": [], "email_message_id": None, "internet_message_id": None}
+        return {"email_candidates": [], "email_message_id": None, "internet_message_id": None, "next_link": None}
 
     q = ctx.get("mailbox_query") or {}
     folder = q.get("folder", "Inbox")
@@ -844,26 +1073,36 @@ def mailbox_o365_search(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     subject_contains = q.get("subject_contains") or []
     has_attachments = q.get("has_attachments", True)
     received_after_iso = q.get("received_after_iso")
-    max_results = int(q.get("max_results", 10))
+    max_results = int(q.get("max_results", 100))
 
-    candidates = client.search_messages(
+    return_all = q.get("return_all", False)
+    # Top candidate only: a one-message page, unless the client-side subject filter may
+    # have to skip messages. next_link is only returned once a page is fully consumed.
+    page_size = min(max_results, 100) if return_all or subject_contains else 1
+    search = client.iter_messages(
         folder=folder,
         from_addresses=from_addresses,
         subject_contains=subject_contains,
         has_attachments=has_attachments,
         received_after_iso=received_after_iso,
-        max_results=max_results,
+        page_size=max(page_size, 1),
     )
+    if return_all:
+        candidates = list(islice(search, max_results))
+    else:
+        first = next(iter(search), None) if max_results > 0 else None
+        candidates = [first] if first is not None else []
     top = candidates[0] if candidates else None
     return {
-        "email_candidates": [c.__dict__ for c in candidates],
+        "email_candidates": [dict(zip(_CANDIDATE_FIELDS, _candidate_values(c))) for c in candidates],
         "email_message_id": top.id if top else None,
         "internet_message_id": top.internet_message_id if top else None,
+        "next_link": search.next_link,
     }
 
 
 def mailbox_o365_fetch(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
-    client = (ctx.get("_runtime") or {}).get("o365_client")
+    client = _rt(ctx).o365_client
     message_id = ctx.get("email_message_id")
     if not client or not message_id:
         return {"email_message": None}
@@ -888,29 +1127,74 @@ def mailbox_o365_fetch(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     }
 
 
+_PDF_EXTS = frozenset({".pdf"})
+_EXCEL_EXTS = frozenset({".xlsx", ".xls", ".csv"})
+
+
+def _spool_attachment(msg_dir: str, idx: int, name: str, data: bytes) -> str:
+    # Index prefix keeps same-named attachments apart; basename drops any path parts.
+    path = os.path.join(msg_dir, f"{idx:02d}_{os.path.basename(name) or 'attachment'}")
+    with open(path, "wb") as fh:
+        fh.write(data)
+    return path
+
+
 def mailbox_o365_attachments(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
-    client = (ctx.get("_runtime") or {}).get("o365_client")
+    client = _rt(ctx).o365_client
     email = ctx.get("email_message") or {}
     message_id = email.get("message_id")
     if not client or not message_id:
-        return {"pdf_files": [], "excel_files": []}
+        return {"pdf_files": [], "excel_files": [], "attachment_dir": None}
 
     files = client.download_file_attachments(message_id)
-    pdf_files = []
-    excel_files = []
-    for f in files:
-        name_l = f.name.lower()
-        entry = {"name": f.name, "content_type": f.content_type, "bytes": f.bytes_data}
-        if name_l.endswith(".pdf") or f.content_type == "application/pdf":
-            pdf_files.append(entry)
-        elif name_l.endswith((".xlsx", ".xls", ".csv")):
-            excel_files.append(entry)
-    return {"pdf_files": pdf_files, "excel_files": excel_files}
+    # Bytes go to disk; ctx (deep-copied per wave) only carries paths and sizes. The message
+    # dir is created on the first kept attachment, under run_job's job-scoped spool_dir (removed
+    # when the job ends). Other callers get it back as attachment_dir and must remove it.
+    spool_dir = _rt(ctx).spool_dir
+    msg_dir: Optional[str] = None
+    pdf_files: List[Dict[str, Any]] = []
+    excel_files: List[Dict[str, Any]] = []
+    add_pdf = pdf_files.append
+    add_excel = excel_files.append
+    try:
+        for idx, f in enumerate(files):
+            name = f.name
+            dot = name.rfind(".")
+            ext = name[dot:].lower() if dot >= 0 else ""
+            if ext in _PDF_EXTS or f.content_type == "application/pdf":
+                add = add_pdf
+            elif ext in _EXCEL_EXTS:
+                add = add_excel
+            else:
+                continue
+            if msg_dir is None:
+                msg_dir = tempfile.mkdtemp(prefix="ordra_att_", dir=spool_dir)
+            path = _spool_attachment(msg_dir, idx, name, f.bytes_data)
+            add({"name": name, "content_type": f.content_type, "path": path, "size": len(f.bytes_data)})
+    except BaseException:
+        if msg_dir is not None:
+            shutil.rmtree(msg_dir, ignore_errors=True)
+        raise
+    return {"pdf_files": pdf_files, "excel_files": excel_files, "attachment_dir": msg_dir}
+
+
+# (DAG had a failed node, action is AUTO_POST, SAP order number present) -> mailbox folder.
+# CS_REVIEW / ASK_CUSTOMER / HOLD and any unknown action all land in "Needs CS".
+_ROUTE_TABLE: Dict[Tuple[bool, bool, bool], str] = {
+    (True, True, True): "Failed",
+    (True, True, False): "Failed",
+    (True, False, True): "Failed",
+    (True, False, False): "Failed",
+    (False, True, True): "Processed",
+    (False, True, False): "Needs CS",
+    (False, False, True): "Needs CS",
+    (False, False, False): "Needs CS",
+}
 
 
 def mailbox_o365_route(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     """Route the email after processing: Processed / Failed / Needs CS."""
-    client = (ctx.get("_runtime") or {}).get("o365_client")
+    client = _rt(ctx).o365_client
     email = ctx.get("email_message") or {}
     message_id = email.get("message_id")
     if not client or not message_id:
@@ -922,14 +1206,7 @@ def mailbox_o365_route(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
     dag_exec = ctx.get("_dag_exec") or {}
     had_failure = bool(dag_exec.get("failed"))
 
-    if had_failure:
-        route = "Failed"
-    elif action == "AUTO_POST" and sap_order_number:
-        route = "Processed"
-    elif action in {"CS_REVIEW", "ASK_CUSTOMER", "HOLD"}:
-        route = "Needs CS"
-    else:
-        route = "Needs CS"
+    route = _ROUTE_TABLE[(had_failure, action == "AUTO_POST", bool(sap_order_number))]
 
     try:
         resp = client.route_message(message_id, route)
@@ -938,42 +1215,59 @@ def mailbox_o365_route(ctx: Dict[str, Any], spec: NodeSpec) -> Dict[str, Any]:
         return {"mailbox_routed": {"route": route, "message_id": message_id, "error": str(e)}}
 
 
+_HANDLERS: Dict[str, Callable[[Dict[str, Any], NodeSpec], Dict[str, Any]]] = {
+    "email.fetch_and_normalize": email_fetch_and_normalize,
+    "agents.intake_agent": agents_intake_agent,
+    "agents.validation_agent": agents_validation_agent,
+    "agents.decision_agent": agents_decision_agent,
+    "agents.audit_agent": agents_audit_agent,
+    "documents.pdf_text.extract": documents_pdf_text_extract,
+    "documents.ocr.run": documents_ocr_run,
+    "documents.excel.parse": documents_excel_parse,
+    "documents.doc_quality_router": documents_doc_quality_router,
+    "skills.retrieve_for_context": skills_retrieve_for_context,
+    "policies.evaluate": policies_evaluate,
+    "trust.evaluate": trust_evaluate,
+    "memory.faiss.retrieve_layout_hints": memory_faiss_retrieve_layout_hints,
+    "memory.episode.retrieve": memory_episode_retrieve,
+    "memory.episode.retrieve_recipes": memory_episode_retrieve_recipes,
+    "memory.faiss.resolve_aliases": memory_faiss_resolve_aliases,
+    "llm.openai.extract_po_schema": llm_openai_extract_po_schema,
+    "agents.verifier_extraction": agents_verifier_extraction,
+    "llm.openai.refine_po_schema": llm_openai_refine_po_schema,
+    "tools.extraction_result": tools_extraction_result,
+    "agents.verifier_decision": agents_verifier_decision,
+    "verifier.verify_decision": verifier_verify_decision,
+    "memory.episode.save": memory_episode_save,
+    "sap.validate_customer": sap_validate_customer,
+    "sap.validate_materials": sap_validate_materials,
+    "sap.validate_pricing": sap_validate_pricing,
+    "sap.validate_credit": sap_validate_credit,
+    "sap.validate_atp": sap_validate_atp,
+    "sap.create_sales_order": sap_create_sales_order,
+    "hitl.create_task_if_needed": hitl_create_task_if_needed,
+    "identity.resolve_customer": identity_resolve_customer,
+    "sap.build_bapi_preview": sap_build_bapi_preview,
+    "mailbox.o365.search": mailbox_o365_search,
+    "mailbox.o365.fetch": mailbox_o365_fetch,
+    "mailbox.o365.attachments": mailbox_o365_attachments,
+    "mailbox.o365.route": mailbox_o365_route,
+}
+
+
+# Integer opcodes for the handler names: graphs built with opcodes=HANDLER_OPCODES dispatch
+# through handler_table(handlers) by index instead of hashing handler names per node visit.
+HANDLER_NAMES: Tuple[str, ...] = tuple(_HANDLERS)
+HANDLER_OPCODES: Dict[str, int] = {name: i for i, name in enumerate(HANDLER_NAMES)}
+
+
 def build_handlers() -> Dict[str, Callable[[Dict[str, Any], NodeSpec], Dict[str, Any]]]:
-    return {
-        "email.fetch_and_normalize": email_fetch_and_normalize,
-        "agents.intake_agent": agents_intake_agent,
-        "agents.validation_agent": agents_validation_agent,
-        "agents.decision_agent": agents_decision_agent,
-        "agents.audit_agent": agents_audit_agent,
-        "documents.pdf_text.extract": documents_pdf_text_extract,
-        "documents.ocr.run": documents_ocr_run,
-        "documents.excel.parse": documents_excel_parse,
-        "documents.doc_quality_router": documents_doc_quality_router,
-        "skills.retrieve_for_context": skills_retrieve_for_context,
-        "policies.evaluate": policies_evaluate,
-        "trust.evaluate": trust_evaluate,
-        "memory.faiss.retrieve_layout_hints": memory_faiss_retrieve_layout_hints,
-        "memory.episode.retrieve": memory_episode_retrieve,
-        "memory.episode.retrieve_recipes": memory_episode_retrieve_recipes,
-        "memory.faiss.resolve_aliases": memory_faiss_resolve_aliases,
-        "llm.openai.extract_po_schema": llm_openai_extract_po_schema,
-        "agents.verifier_extraction": agents_verifier_extraction,
-        "llm.openai.refine_po_schema": llm_openai_refine_po_schema,
-        "tools.extraction_result": tools_extraction_result,
-        "agents.verifier_decision": agents_verifier_decision,
-        "verifier.verify_decision": verifier_verify_decision,
-        "memory.episode.save": memory_episode_save,
-        "sap.validate_customer": sap_validate_customer,
-        "sap.validate_materials": sap_validate_materials,
-        "sap.validate_pricing": sap_validate_pricing,
-        "sap.validate_credit": sap_validate_credit,
-        "sap.validate_atp": sap_validate_atp,
-        "sap.create_sales_order": sap_create_sales_order,
-        "hitl.create_task_if_needed": hitl_create_task_if_needed,
-        "identity.resolve_customer": identity_resolve_customer,
-        "sap.build_bapi_preview": sap_build_bapi_preview,
-        "mailbox.o365.search": mailbox_o365_search,
-        "mailbox.o365.fetch": mailbox_o365_fetch,
-        "mailbox.o365.attachments": mailbox_o365_attachments,
-        "mailbox.o365.route": mailbox_o365_route,
-    }
+    """Fresh copy of the dispatch table; callers may replace entries."""
+    return dict(_HANDLERS)
+
+
+def handler_table(
+    handlers: Mapping[str, Callable[[Dict[str, Any], NodeSpec], Dict[str, Any]]],
+) -> Tuple[Optional[Callable[[Dict[str, Any], NodeSpec], Dict[str, Any]]], ...]:
+    """handlers laid out by HANDLER_OPCODES (None where a name is missing)."""
+    return tuple(handlers.get(name) for name in HANDLER_NAMES)
@@ -1,42 +1,47 @@
 from __future__ import annotations
 
+import os
+import tempfile
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+import networkx as nx
+
 from ordra.agents.verifier_agent import GeminiVerifier
 from ordra.connectors.o365_client import O365Client, O365Error
 from ordra.db.sqlite import SQLiteDB
 from ordra.llm.openai_client import OpenAIClient, LLMConfig
 from ordra.memory.episodic import EpisodicMemoryStore
 from ordra.orchestration.dag_spec import build_graph_from_yaml
-from ordra.sap.sap_client import SapClient
+from ordra.sap.sap_client import SapClient, get_sap_config
 from ordra.sap.validation import SapValidator
 from ordra.orchestration.executor import ParallelDAGExecutor
-from ordra.runtime.handlers import build_handlers
+from ordra.runtime.handlers import HANDLER_OPCODES, build_handlers, handler_table, runtime_bundle
+
+
+_BASE = Path(__file__).resolve().parent.parent
+_DEFAULT_DAG_PATH = str(_BASE / "orchestration" / "dag_spec.yaml")
+_DEFAULT_PROMPTS_DIR = str(_BASE / "llm" / "prompts")
+_DEFAULT_SCHEMAS_DIR = str(_BASE / "llm" / "schemas")
 
 
 def _default_dag_path() -> str:
-    p = Path(__file__).resolve().parent.parent / "orchestration" / "dag_spec.yaml"
-    return str(p)
+    return _DEFAULT_DAG_PATH
 
 
-def run_job(
-    job_input: Dict[str, Any],
-    *,
-    dag_yaml_path: Optional[str] = None,
-    prompts_dir: Optional[str] = None,
-    schemas_dir: Optional[str] = None,
-    max_workers: int = 6,
-    runtime_overrides: Optional[Dict[str, Any]] = None,
-) -> Dict[str, Any]:
-    base = Path(__file__).resolve().parent.parent
-    dag_yaml_path = dag_yaml_path or _default_dag_path()
-    if not Path(dag_yaml_path).is_file():
-        dag_yaml_path = str(base / "orchestration" / "dag_spec.yaml")
-    prompts_dir = prompts_dir or str(base / "llm" / "prompts")
-    schemas_dir = schemas_dir or str(base / "llm" / "schemas")
-
-    openai_client = OpenAIClient(
+@lru_cache(maxsize=8)
+def _load_graph(path: str, mtime: float) -> nx.DiGraph:
+    """Parsed DAG per (path, mtime): edits to the YAML are picked up on the next job."""
+    return build_graph_from_yaml(path, opcodes=HANDLER_OPCODES)
+
+
+# Process-wide clients: built on first use and reused by every job in this process
+# (prompt/schema setup, env parsing and DB schema init happen once). Per-job
+# runtime_overrides still take precedence over these.
+@lru_cache(maxsize=1)
+def _get_openai_client(prompts_dir: str, schemas_dir: str) -> OpenAIClient:
+    return OpenAIClient(
         prompts_dir=prompts_dir,
         schemas_dir=schemas_dir,
         config=LLMConfig(
@@ -48,10 +53,79 @@ def run_job(
         ),
     )
 
-    db = SQLiteDB("ordra.db")
+
+@lru_cache(maxsize=1)
+def _get_db(path: str) -> SQLiteDB:
+    db = SQLiteDB(path)
     db.init()
-    episode_store = EpisodicMemoryStore(db)
-    verifier = GeminiVerifier()
+    return db
+
+
+@lru_cache(maxsize=1)
+def _get_episode_store(path: str) -> EpisodicMemoryStore:
+    return EpisodicMemoryStore(_get_db(path))
+
+
+@lru_cache(maxsize=1)
+def _get_verifier() -> GeminiVerifier:
+    return GeminiVerifier()
+
+
+@lru_cache(maxsize=1)
+def _o365_client() -> O365Client:
+    return O365Client()
+
+
+def _get_o365_client() -> Optional[O365Client]:
+    # lru_cache does not store exceptions, so a failed setup is retried by the next job.
+    try:
+        return _o365_client()
+    except O365Error:
+        return None
+
+
+# Keyed by the SAP config snapshot, so SapClient.reload_config() yields fresh instances.
+@lru_cache(maxsize=1)
+def _sap_client_for(cfg: Any) -> SapClient:
+    return SapClient()
+
+
+@lru_cache(maxsize=1)
+def _sap_validator_for(cfg: Any) -> SapValidator:
+    return SapValidator()
+
+
+def _get_sap_client() -> SapClient:
+    return _sap_client_for(get_sap_config())
+
+
+def _get_sap_validator() -> SapValidator:
+    return _sap_validator_for(get_sap_config())
+
+
+def run_job(
+    job_input: Dict[str, Any],
+    *,
+    dag_yaml_path: Optional[str] = None,
+    prompts_dir: Optional[str] = None,
+    schemas_dir: Optional[str] = None,
+    max_workers: int = 6,
+    runtime_overrides: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    dag_yaml_path = dag_yaml_path or _DEFAULT_DAG_PATH
+    if not os.path.isfile(dag_yaml_path):
+        dag_yaml_path = _DEFAULT_DAG_PATH
+    dag_yaml_path = os.path.abspath(dag_yaml_path)
+    prompts_dir = prompts_dir or _DEFAULT_PROMPTS_DIR
+    schemas_dir = schemas_dir or _DEFAULT_SCHEMAS_DIR
+
+    openai_client = _get_openai_client(prompts_dir, schemas_dir)
+    # ordra.db lives in the caller's cwd; the absolute path keys the cached DB so a job run
+    # from another cwd gets its own (initialised) database.
+    db_path = os.path.abspath("ordra.db")
+    db = _get_db(db_path)
+    episode_store = _get_episode_store(db_path)
+    verifier = _get_verifier()
 
     ctx: Dict[str, Any] = dict(job_input)
     ctx["_runtime"] = {
@@ -62,20 +136,28 @@ def run_job(
         "hitl_tasks": {},
         "model_extractor": openai_client.config.model_chat,
         "model_verifier": verifier.config.model,
+        "o365_client": _get_o365_client(),
+        "sap_client": _get_sap_client(),
+        "sap_validator": _get_sap_validator(),
     }
-    try:
-        ctx["_runtime"]["o365_client"] = O365Client()
-    except O365Error:
-        ctx["_runtime"]["o365_client"] = None
-    ctx["_runtime"]["sap_client"] = SapClient()
-    ctx["_runtime"]["sap_validator"] = SapValidator()
     if runtime_overrides:
         ctx["_runtime"].update(runtime_overrides)
 
-    graph = build_graph_from_yaml(dag_yaml_path)
+    graph = _load_graph(dag_yaml_path, os.path.getmtime(dag_yaml_path))
     handlers = build_handlers()
-    executor = ParallelDAGExecutor(handlers=handlers, max_workers=max_workers, enable_wave_parallelism=True)
-    out_ctx = executor.run(graph, ctx)
+    executor = ParallelDAGExecutor(
+        handlers=handlers,
+        max_workers=max_workers,
+        enable_wave_parallelism=True,
+        handler_table=handler_table(handlers),
+    )
+    # Downloaded attachments are spooled in a job-scoped dir that is removed when the run
+    # ends, so attachment paths in the returned ctx are only valid during the run.
+    with tempfile.TemporaryDirectory(prefix="ordra_job_") as spool_dir:
+        ctx["_runtime"].setdefault("spool_dir", spool_dir)
+        # Handlers read the same objects through attribute access; hitl_tasks stays shared.
+        ctx["_rt"] = runtime_bundle(ctx["_runtime"])
+        out_ctx = executor.run(graph, ctx)
     return out_ctx
 
 
@@ -1,12 +1,17 @@
 """SAP client: stub (deterministic SO 0090012345) or ECC via RFC (pyrfc)."""
 from __future__ import annotations
 
+import atexit
 import os
+import queue
+import threading
+import warnings
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SapResult:
     ok: bool
     sales_order: Optional[str] = None
@@ -14,6 +19,180 @@ class SapResult:
     error: Optional[str] = None
 
 
+@dataclass(slots=True, frozen=True)
+class _SapConfig:
+    mode: str
+    user: str
+    passwd: str
+    ashost: str
+    sysnr: str
+    client: str
+    lang: str
+    pool_size: str  # raw SAP_POOL_SIZE; parsed by pool_size_value() when the RFC pool is built
+    stub_dir: str
+
+    @classmethod
+    def from_env(cls) -> "_SapConfig":
+        return cls(
+            mode=os.getenv("SAP_MODE", "stub").strip().lower(),
+            user=os.getenv("SAP_USER", ""),
+            passwd=os.getenv("SAP_PASS", ""),
+            ashost=os.getenv("SAP_ASHOST", ""),
+            sysnr=os.getenv("SAP_SYSNR", ""),
+            client=os.getenv("SAP_CLIENT", ""),
+            lang=os.getenv("SAP_LANG", "EN"),
+            pool_size=os.getenv("SAP_POOL_SIZE", "4"),
+            stub_dir=os.getenv("SAP_STUB_DIR", ""),
+        )
+
+    def pool_size_value(self) -> int:
+        try:
+            return max(1, int(self.pool_size))
+        except ValueError:
+            warnings.warn(
+                f"Invalid SAP_POOL_SIZE={self.pool_size!r}; using 4", RuntimeWarning, stacklevel=2
+            )
+            return 4
+
+    def conn_params(self) -> Dict[str, str]:
+        return {
+            "user": self.user,
+            "passwd": self.passwd,
+            "ashost": self.ashost,
+            "sysnr": self.sysnr,
+            "client": self.client,
+            "lang": self.lang,
+        }
+
+
+def _compute_ecc_params(cfg: _SapConfig) -> Tuple[Dict[str, str], List[str]]:
+    conn_params = cfg.conn_params()
+    missing = [k for k, v in conn_params.items() if not v and k != "lang"]
+    return conn_params, missing
+
+
+# SAP_* env vars are read once per process; call SapClient.reload_config() after changing them.
+_CFG = _SapConfig.from_env()
+_ECC_CONN_PARAMS, _ECC_MISSING = _compute_ecc_params(_CFG)
+
+
+def get_sap_config() -> _SapConfig:
+    """Current SAP_* settings snapshot (replaced, not mutated, by SapClient.reload_config())."""
+    return _CFG
+
+
+def _close_quietly(conn: Any) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+class _RfcPool:
+    """
+    Bounded pool of logged-on RFC connections (logon is the expensive part of a call).
+    Connections are created lazily up to `size`, pinged before reuse and dropped if the
+    block using them raises.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int) -> None:
+        self._factory = factory
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        self._slots.acquire()
+        conn = None
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            if conn is not None:
+                try:
+                    conn.ping()
+                except Exception:
+                    _close_quietly(conn)
+                    conn = None
+            if conn is None:
+                conn = self._factory()
+            yield conn
+        except BaseException:
+            if conn is not None:
+                _close_quietly(conn)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._idle.put(conn)
+            self._slots.release()
+
+    def close_all(self) -> None:
+        while True:
+            try:
+                _close_quietly(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+_RFC_POOL: Optional[_RfcPool] = None
+_RFC_POOL_LOCK = threading.Lock()
+
+
+def _get_rfc_pool(connection_cls: Callable[..., Any]) -> _RfcPool:
+    global _RFC_POOL
+    with _RFC_POOL_LOCK:
+        if _RFC_POOL is None:
+            params = _ECC_CONN_PARAMS
+            _RFC_POOL = _RfcPool(lambda: connection_cls(**params), _CFG.pool_size_value())
+        return _RFC_POOL
+
+
+@contextmanager
+def rfc_connection() -> Iterator[Any]:
+    """
+    Borrow a logged-on RFC connection from the shared pool (also used by SapValidator).
+    Raises if pyrfc is missing or SAP_* connection vars are unset.
+    """
+    from pyrfc import Connection  # type: ignore
+
+    if _ECC_MISSING:
+        raise RuntimeError(f"Missing SAP connection env vars: {_ECC_MISSING}")
+    with _get_rfc_pool(Connection).connection() as conn:
+        yield conn
+
+
+@atexit.register
+def _close_rfc_pool() -> None:
+    global _RFC_POOL
+    with _RFC_POOL_LOCK:
+        pool, _RFC_POOL = _RFC_POOL, None
+    if pool is not None:
+        pool.close_all()
+
+
+def _sales_doc_from(out: Any) -> Optional[str]:
+    if not isinstance(out, dict):
+        return None
+    sales_doc = out.get("SALESDOCUMENT")
+    if not sales_doc and isinstance(out.get("RETURN"), list) and out["RETURN"]:
+        first = out["RETURN"][0]
+        if isinstance(first, dict) and first.get("TYPE") == "S":
+            sales_doc = first.get("MESSAGE_V2") or first.get("MESSAGE_V1")
+    return sales_doc
+
+
+def _bapi_error_from(out: Dict[str, Any]) -> str:
+    return_msgs = out.get("RETURN") or []
+    if not isinstance(return_msgs, list):
+        return_msgs = [return_msgs] if return_msgs else []
+    err_txt = "; ".join(
+        [f"{m.get('TYPE')}:{m.get('MESSAGE')}" for m in return_msgs if isinstance(m, dict)]
+    )[:1000]
+    return err_txt or "BAPI returned no document"
+
+
 class SapClient:
     """
     SAP client wrapper.
@@ -23,15 +202,43 @@ class SapClient:
     """
 
     def __init__(self) -> None:
-        self.mode = os.getenv("SAP_MODE", "stub").strip().lower()
+        self.mode = _CFG.mode
 
-    def create_sales_order(self, order_payload: Dict[str, Any]) -> SapResult:
+    @classmethod
+    def reload_config(cls) -> None:
+        """Re-read SAP_* env vars; run_job and clients/validators created afterwards use the new values."""
+        global _CFG
+        _CFG = _SapConfig.from_env()
+        cls.invalidate_ecc_cache()
+
+    @classmethod
+    def invalidate_ecc_cache(cls) -> None:
+        """Recompute the cached RFC connection params from the current config and drop pooled connections."""
+        global _ECC_CONN_PARAMS, _ECC_MISSING
+        _ECC_CONN_PARAMS, _ECC_MISSING = _compute_ecc_params(_CFG)
+        _close_rfc_pool()
+
+    def create_sales_order(
+        self, order_payload: Dict[str, Any], bapi_in: Optional[Dict[str, Any]] = None
+    ) -> SapResult:
+        """bapi_in: map_to_bapi_createfromdat2(order_payload) if the caller already has it."""
         if self.mode == "stub":
             return self._create_sales_order_stub(order_payload)
         if self.mode == "ecc":
-            return self._create_sales_order_ecc(order_payload)
+            return self._create_sales_order_ecc(order_payload, bapi_in)
         return SapResult(ok=False, error=f"Unknown SAP_MODE={self.mode}")
 
+    def create_sales_orders(self, order_payloads: List[Dict[str, Any]]) -> List[SapResult]:
+        """
+        Create several orders, one result per payload (same order).
+        In ECC mode the creates share one pooled connection and a single commit.
+        """
+        if self.mode == "stub":
+            return [self._create_sales_order_stub(p) for p in order_payloads]
+        if self.mode == "ecc":
+            return self._create_sales_orders_ecc(order_payloads)
+        return [SapResult(ok=False, error=f"Unknown SAP_MODE={self.mode}") for _ in order_payloads]
+
     # -------------------------
     # STUB MODE
     # -------------------------
@@ -57,7 +264,9 @@ class SapClient:
     # -------------------------
     # ECC MODE (RFC)
     # -------------------------
-    def _create_sales_order_ecc(self, order_payload: Dict[str, Any]) -> SapResult:
+    def _create_sales_order_ecc(
+        self, order_payload: Dict[str, Any], bapi_in: Optional[Dict[str, Any]] = None
+    ) -> SapResult:
         """
         Real ECC call via pyrfc.
         You must install SAP NW RFC SDK + pyrfc and provide connection params.
@@ -67,52 +276,95 @@ class SapClient:
         except Exception as e:
             return SapResult(ok=False, error=f"pyrfc not available: {e}")
 
-        conn_params = {
-            "user": os.getenv("SAP_USER", ""),
-            "passwd": os.getenv("SAP_PASS", ""),
-            "ashost": os.getenv("SAP_ASHOST", ""),
-            "sysnr": os.getenv("SAP_SYSNR", ""),
-            "client": os.getenv("SAP_CLIENT", ""),
-            "lang": os.getenv("SAP_LANG", "EN"),
-        }
-        missing = [k for k, v in conn_params.items() if not v and k != "lang"]
-        if missing:
-            return SapResult(ok=False, error=f"Missing SAP connection env vars: {missing}")
+        if _ECC_MISSING:
+            return SapResult(ok=False, error=f"Missing SAP connection env vars: {_ECC_MISSING}")
 
-        conn = None
+        committing = False
         try:
-            conn = Connection(**conn_params)
-            bapi_in = map_to_bapi_createfromdat2(order_payload)
-            out = conn.call("BAPI_SALESORDER_CREATEFROMDAT2", **bapi_in)
-
-            sales_doc = None
-            if isinstance(out, dict):
-                sales_doc = out.get("SALESDOCUMENT")
-                if not sales_doc and isinstance(out.get("RETURN"), list) and out["RETURN"]:
-                    first = out["RETURN"][0]
-                    if isinstance(first, dict) and first.get("TYPE") == "S":
-                        sales_doc = first.get("MESSAGE_V2") or first.get("MESSAGE_V1")
-
-            if sales_doc:
-                conn.call("BAPI_TRANSACTION_COMMIT", WAIT="X")
-                return SapResult(ok=True, sales_order=str(sales_doc), raw=dict(out))
-
-            return_msgs = out.get("RETURN") or []
-            if not isinstance(return_msgs, list):
-                return_msgs = [return_msgs] if return_msgs else []
-            err_txt = "; ".join(
-                [f"{m.get('TYPE')}:{m.get('MESSAGE')}" for m in return_msgs if isinstance(m, dict)]
-            )[:1000]
-            return SapResult(ok=False, error=err_txt or "BAPI returned no document", raw=dict(out))
+            with _get_rfc_pool(Connection).connection() as conn:
+                if bapi_in is None:
+                    bapi_in = map_to_bapi_createfromdat2(order_payload)
+                out = conn.call("BAPI_SALESORDER_CREATEFROMDAT2", **bapi_in)
+
+                sales_doc = _sales_doc_from(out)
+                if sales_doc:
+                    committing = True
+                    conn.call("BAPI_TRANSACTION_COMMIT", WAIT="X")
+                    return SapResult(ok=True, sales_order=str(sales_doc), raw=dict(out))
+
+                # Pooled sessions are reused: discard any buffered state of the failed create.
+                conn.call("BAPI_TRANSACTION_ROLLBACK")
+
+            return SapResult(ok=False, error=_bapi_error_from(out), raw=dict(out))
 
         except Exception as e:
+            if committing:
+                return _commit_unknown(str(sales_doc), dict(out), e)
             return SapResult(ok=False, error=str(e))
-        finally:
-            if conn is not None:
-                try:
-                    conn.close()
-                except Exception:
-                    pass
+
+    def _create_sales_orders_ecc(self, order_payloads: List[Dict[str, Any]]) -> List[SapResult]:
+        """
+        Create all orders in one LUW and commit once. If a create fails (error return or
+        exception) the LUW is rolled back and the batch is split in half and retried, down
+        to single orders, so one bad order only costs its own result.
+        Nothing is retried when logon fails, or when the commit itself raises: the orders
+        may already be posted, so they are reported as commit-status-unknown instead.
+        """
+        if len(order_payloads) <= 1:
+            return [self._create_sales_order_ecc(p) for p in order_payloads]
+
+        try:
+            from pyrfc import Connection
+        except Exception as e:
+            return [SapResult(ok=False, error=f"pyrfc not available: {e}") for _ in order_payloads]
+
+        if _ECC_MISSING:
+            err = f"Missing SAP connection env vars: {_ECC_MISSING}"
+            return [SapResult(ok=False, error=err) for _ in order_payloads]
+
+        phase = "logon"
+        created: List[SapResult] = []
+        try:
+            with _get_rfc_pool(Connection).connection() as conn:
+                phase = "create"
+                for payload in order_payloads:
+                    out = conn.call("BAPI_SALESORDER_CREATEFROMDAT2", **map_to_bapi_createfromdat2(payload))
+                    sales_doc = _sales_doc_from(out)
+                    if not sales_doc:
+                        conn.call("BAPI_TRANSACTION_ROLLBACK")
+                        break
+                    created.append(SapResult(ok=True, sales_order=str(sales_doc), raw=dict(out)))
+                else:
+                    phase = "commit"
+                    conn.call("BAPI_TRANSACTION_COMMIT", WAIT="X")
+                    return created
+        except Exception as e:
+            if phase == "logon":
+                return [SapResult(ok=False, error=str(e)) for _ in order_payloads]
+            if phase == "commit":
+                return [_commit_unknown(r.sales_order, r.raw, e) for r in created]
+            # A create raised: the pool drops the connection and SAP rolls back the open LUW
+            # on logoff, so the batch can be split and retried.
+
+        mid = len(order_payloads) // 2
+        return self._create_sales_orders_ecc(order_payloads[:mid]) + self._create_sales_orders_ecc(
+            order_payloads[mid:]
+        )
+
+
+def _commit_unknown(sales_order: Optional[str], raw: Optional[Dict[str, Any]], exc: Exception) -> SapResult:
+    # The commit may have gone through on the SAP side: never re-post, check the order first.
+    return SapResult(
+        ok=False,
+        sales_order=sales_order,
+        raw=raw,
+        error=f"Commit status unknown (check SAP before re-posting): {exc}",
+    )
+
+
+# Constant change-indicator rows; only ITM_NUMBER varies per line.
+_ITM_INX_TPL = {"UPDATEFLAG": "I", "MATERIAL": "X", "PLANT": "X"}
+_SCHED_INX_TPL = {"SCHED_LINE": "0001", "UPDATEFLAG": "I", "REQ_QTY": "X", "REQ_DATE": "X"}
 
 
 def map_to_bapi_createfromdat2(order_payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -137,45 +389,49 @@ def map_to_bapi_createfromdat2(order_payload: Dict[str, Any]) -> Dict[str, Any]:
         {"PARTN_ROLE": "WE", "PARTN_NUMB": str(order_payload.get("ship_to", ""))[:10]},
     ]
 
-    order_items_in: List[Dict[str, Any]] = []
-    order_items_inx: List[Dict[str, Any]] = []
-    order_schedules_in: List[Dict[str, Any]] = []
-    order_schedules_inx: List[Dict[str, Any]] = []
-
-    plant_default = order_payload.get("plant", "IN01")
-    for idx, it in enumerate(items, start=10):
-        itm_no = str(idx).zfill(6)
-        mat = it.get("material") or ""
-        pl = str(it.get("plant") or plant_default)[:4]
-        qty = it.get("qty")
+    n = len(items)
+    order_items_in: List[Dict[str, Any]] = [None] * n  # type: ignore[list-item]
+    order_items_inx: List[Dict[str, Any]] = [None] * n  # type: ignore[list-item]
+    order_schedules_in: List[Dict[str, Any]] = [None] * n  # type: ignore[list-item]
+    order_schedules_inx: List[Dict[str, Any]] = [None] * n  # type: ignore[list-item]
+
+    # Per-order defaults are truncated once; per-item values only when over length.
+    plant_default = str(order_payload.get("plant", "IN01"))[:4]
+    req_date_default = req_date_h[:10]
+    itm_inx_tpl = _ITM_INX_TPL
+    sched_inx_tpl = _SCHED_INX_TPL
+    for i, it in enumerate(items):
+        itm_no = str(i + 10).zfill(6)
+        get = it.get
+        mat = str(get("material") or "")
+        if len(mat) > 18:
+            mat = mat[:18]
+        pl = get("plant")
+        if pl:
+            pl = str(pl)
+            if len(pl) > 4:
+                pl = pl[:4]
+        else:
+            pl = plant_default
+        qty = get("qty")
         if qty is None:
             qty = 0
-        req_date = (it.get("req_date") or req_date_h)[:10] if (it.get("req_date") or req_date_h) else ""
+        req_date = get("req_date")
+        req_date = req_date[:10] if req_date else req_date_default
 
-        order_items_in.append({
+        order_items_in[i] = {
             "ITM_NUMBER": itm_no,
-            "MATERIAL": str(mat)[:18],
+            "MATERIAL": mat,
             "PLANT": pl,
-        })
-        order_items_inx.append({
-            "ITM_NUMBER": itm_no,
-            "UPDATEFLAG": "I",
-            "MATERIAL": "X",
-            "PLANT": "X",
-        })
-        order_schedules_in.append({
+        }
+        order_items_inx[i] = {"ITM_NUMBER": itm_no, **itm_inx_tpl}
+        order_schedules_in[i] = {
             "ITM_NUMBER": itm_no,
             "SCHED_LINE": "0001",
             "REQ_QTY": str(qty),
             "REQ_DATE": req_date,
-        })
-        order_schedules_inx.append({
-            "ITM_NUMBER": itm_no,
-            "SCHED_LINE": "0001",
-            "UPDATEFLAG": "I",
-            "REQ_QTY": "X",
-            "REQ_DATE": "X",
-        })
+        }
+        order_schedules_inx[i] = {"ITM_NUMBER": itm_no, **sched_inx_tpl}
 
     return {
         "ORDER_HEADER_IN": order_header_in,
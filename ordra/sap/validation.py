@@ -4,14 +4,62 @@ from __future__ import annotations
 import json
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from ordra.sap.sap_client import get_sap_config, rfc_connection
 
+try:
+    import orjson
+except ImportError:  # optional C accelerator; stdlib json is the fallback
+    orjson = None
+
+
+@lru_cache(maxsize=None)
 def _default_stub_dir() -> Path:
     return Path(__file__).resolve().parent.parent / "stubs" / "sap"
 
 
+def _stub_dir_for(configured: str) -> Path:
+    """SAP_STUB_DIR if it is an absolute path, else the bundled stubs."""
+    if configured and Path(configured).is_absolute():
+        return Path(configured)
+    return _default_stub_dir()
+
+
+# Parsed stub files are cached per (path, mtime_ns): edits are picked up, unchanged files are
+# decoded once per process. Cached values are shared, so callers must treat them as read-only.
+@lru_cache(maxsize=32)
+def _load_stub_cached(path_str: str, mtime_ns: int) -> Any:
+    raw = Path(path_str).read_bytes()
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)  # parses the UTF-8 bytes directly, no str decode
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN literals; stdlib accepts them or raises the usual error
+    return json.loads(raw.decode("utf-8"))
+
+
+@lru_cache(maxsize=8)
+def _materials_index(
+    path_str: str, mtime_ns: int
+) -> Dict[Tuple[str, str], Tuple[Dict[str, Any], bool]]:
+    """(material, plant or "") -> (stub record, is ACTIVE)."""
+    mats = _load_stub_cached(path_str, mtime_ns) or []
+    return {
+        (m["material"], m.get("plant") or ""): (m, (m.get("status") or "").upper() == "ACTIVE")
+        for m in mats
+    }
+
+
+@lru_cache(maxsize=8)
+def _pr00_prices(path_str: str, mtime_ns: int) -> Dict[str, float]:
+    pricing = _load_stub_cached(path_str, mtime_ns) or {}
+    conds = pricing.get("conditions") or []
+    return {c["material"]: float(c["price"]) for c in conds if c.get("condition_type") == "PR00"}
+
+
 @dataclass
 class ValidationIssue:
     code: str
@@ -57,11 +105,10 @@ class SapValidator:
     """
 
     def __init__(self) -> None:
-        self.mode = os.getenv("SAP_MODE", "stub").strip().lower()
-        stub_dir = os.getenv("SAP_STUB_DIR", "")
-        self.stub_dir = Path(stub_dir) if stub_dir else _default_stub_dir()
-        if not self.stub_dir.is_absolute():
-            self.stub_dir = _default_stub_dir()
+        # Same env snapshot as SapClient (SapClient.reload_config() refreshes it).
+        cfg = get_sap_config()
+        self.mode = cfg.mode
+        self.stub_dir = _stub_dir_for(cfg.stub_dir)
 
     # ---------------------------
     # Public API
@@ -93,11 +140,19 @@ class SapValidator:
     # ---------------------------
     # STUB MODE
     # ---------------------------
-    def _stub_load_json(self, name: str) -> Any:
+    def _stub_key(self, name: str) -> Optional[Tuple[str, int]]:
+        """(path, mtime_ns) cache key for a stub file, or None if it does not exist."""
         p = self.stub_dir / name
-        if not p.exists():
+        try:
+            return str(p), p.stat().st_mtime_ns
+        except OSError:
             return None
-        return json.loads(p.read_text(encoding="utf-8"))
+
+    def _stub_load_json(self, name: str) -> Any:
+        key = self._stub_key(name)
+        if key is None:
+            return None
+        return _load_stub_cached(*key)
 
     def _stub_validate_customer(
         self, sold_to: str, ship_to: str
@@ -138,8 +193,8 @@ class SapValidator:
         self, items: List[Dict[str, Any]], default_plant: Optional[str]
     ) -> Tuple[Dict[str, MaterialInfo], List[ValidationIssue]]:
         issues: List[ValidationIssue] = []
-        mats = self._stub_load_json("materials_demo.json") or []
-        idx = {(m["material"], m.get("plant") or ""): m for m in mats}
+        key = self._stub_key("materials_demo.json")
+        idx = _materials_index(*key) if key else {}
         out: Dict[str, MaterialInfo] = {}
 
         for it in items:
@@ -147,8 +202,8 @@ class SapValidator:
             mat = it.get("MATERIAL") or ""
             plant = it.get("PLANT") or default_plant or "IN01"
 
-            m = idx.get((mat, plant)) or idx.get((mat, ""))
-            if not m:
+            entry = idx.get((mat, plant)) or idx.get((mat, ""))
+            if entry is None:
                 issues.append(
                     ValidationIssue(
                         "MAT_NOT_FOUND",
@@ -160,7 +215,8 @@ class SapValidator:
                 )
                 continue
 
-            if (m.get("status") or "").upper() != "ACTIVE":
+            m, active = entry
+            if not active:
                 issues.append(
                     ValidationIssue(
                         "MAT_INACTIVE", "BLOCK", f"Material {mat} is inactive", "MATERIAL", item_number=itm_no
@@ -181,9 +237,8 @@ class SapValidator:
         self, sold_to: str, items: List[Dict[str, Any]], currency: str
     ) -> PricingResult:
         issues: List[ValidationIssue] = []
-        pricing = self._stub_load_json("pricing_demo.json") or {}
-        conds = pricing.get("conditions") or []
-        price_by_mat = {c["material"]: float(c["price"]) for c in conds if c.get("condition_type") == "PR00"}
+        key = self._stub_key("pricing_demo.json")
+        price_by_mat = _pr00_prices(*key) if key else {}
 
         item_prices: Dict[str, float] = {}
         for it in items:
@@ -208,113 +263,95 @@ class SapValidator:
     # ---------------------------
     # ECC MODE (RFC)
     # ---------------------------
-    def _ecc_conn(self) -> Any:
-        from pyrfc import Connection  # type: ignore
-
-        params = {
-            "user": os.getenv("SAP_USER", ""),
-            "passwd": os.getenv("SAP_PASS", ""),
-            "ashost": os.getenv("SAP_ASHOST", ""),
-            "sysnr": os.getenv("SAP_SYSNR", ""),
-            "client": os.getenv("SAP_CLIENT", ""),
-            "lang": os.getenv("SAP_LANG", "EN"),
-        }
-        missing = [k for k, v in params.items() if not v and k != "lang"]
-        if missing:
-            raise RuntimeError(f"Missing SAP connection env vars: {missing}")
-        return Connection(**params)
-
     def _ecc_validate_customer(
         self, sold_to: str, ship_to: str
     ) -> Tuple[Optional[CustomerInfo], List[ValidationIssue]]:
         issues: List[ValidationIssue] = []
-        conn = None
         try:
-            conn = self._ecc_conn()
-            out = conn.call("BAPI_CUSTOMER_GETDETAIL2", CUSTOMERNO=sold_to)
-            name = ((out.get("CUSTOMERADDRESS") or {}).get("NAME")) or sold_to
-
-            sales_org = os.getenv("SAP_SALES_ORG", "IN01")
-            dist = os.getenv("SAP_DIST_CHANNEL", "10")
-            div = os.getenv("SAP_DIVISION", "00")
-
-            ci = CustomerInfo(
-                customer_code=sold_to,
-                name1=name,
-                sales_org=sales_org,
-                dist_channel=dist,
-                division=div,
-            )
+            with rfc_connection() as conn:
+                out = conn.call("BAPI_CUSTOMER_GETDETAIL2", CUSTOMERNO=sold_to)
+                name = ((out.get("CUSTOMERADDRESS") or {}).get("NAME")) or sold_to
+
+                sales_org = os.getenv("SAP_SALES_ORG", "IN01")
+                dist = os.getenv("SAP_DIST_CHANNEL", "10")
+                div = os.getenv("SAP_DIVISION", "00")
+
+                ci = CustomerInfo(
+                    customer_code=sold_to,
+                    name1=name,
+                    sales_org=sales_org,
+                    dist_channel=dist,
+                    division=div,
+                )
 
-            if ship_to != sold_to:
-                try:
-                    conn.call("BAPI_CUSTOMER_GETDETAIL2", CUSTOMERNO=ship_to)
-                except Exception:
-                    issues.append(
-                        ValidationIssue(
-                            "SHIP_TO_NOT_FOUND", "BLOCK", f"Ship-to {ship_to} not found in ECC", "ship_to"
+                if ship_to != sold_to:
+                    try:
+                        conn.call("BAPI_CUSTOMER_GETDETAIL2", CUSTOMERNO=ship_to)
+                    except Exception:
+                        issues.append(
+                            ValidationIssue(
+                                "SHIP_TO_NOT_FOUND", "BLOCK", f"Ship-to {ship_to} not found in ECC", "ship_to"
+                            )
                         )
-                    )
 
-            return ci, issues
+                return ci, issues
         except Exception as e:
             issues.append(
                 ValidationIssue("CUST_LOOKUP_FAIL", "BLOCK", f"Customer lookup failed: {e}", "sold_to")
             )
             return None, issues
-        finally:
-            if conn is not None:
-                try:
-                    conn.close()
-                except Exception:
-                    pass
 
     def _ecc_validate_materials(
         self, items: List[Dict[str, Any]], default_plant: Optional[str]
     ) -> Tuple[Dict[str, MaterialInfo], List[ValidationIssue]]:
         issues: List[ValidationIssue] = []
-        conn = None
         out: Dict[str, MaterialInfo] = {}
-        try:
-            conn = self._ecc_conn()
+        with rfc_connection() as conn:
             default_pl = default_plant or os.getenv("SAP_DEFAULT_PLANT", "IN01")
+            # One GET_DETAIL roundtrip per distinct material, not per line item.
+            details: Dict[str, Any] = {}
             for it in items:
                 itm_no = it.get("ITM_NUMBER")
                 mat = it.get("MATERIAL") or ""
                 plant = it.get("PLANT") or default_pl
 
-                try:
-                    m = conn.call("BAPI_MATERIAL_GET_DETAIL", MATERIAL=mat)
-                    descs = m.get("MATERIALDESCRIPTION") or []
-                    desc = (descs[0].get("MATL_DESC", "") or "") if descs else ""
-                    base_uom = ((m.get("MATERIALGENERALDATA") or {}).get("BASE_UOM")) or ""
-
-                    out[itm_no] = MaterialInfo(
-                        material=mat,
-                        description=desc,
-                        uom=base_uom,
-                        material_group=((m.get("MATERIALGENERALDATA") or {}).get("MATL_GROUP")) or "",
-                        plant=plant,
-                        status="ACTIVE",
-                    )
-                except Exception as e:
+                if mat not in details:
+                    try:
+                        m = conn.call("BAPI_MATERIAL_GET_DETAIL", MATERIAL=mat)
+                        descs = m.get("MATERIALDESCRIPTION") or []
+                        general = m.get("MATERIALGENERALDATA") or {}
+                        details[mat] = (
+                            (descs[0].get("MATL_DESC", "") or "") if descs else "",
+                            general.get("BASE_UOM") or "",
+                            general.get("MATL_GROUP") or "",
+                        )
+                    except Exception as e:
+                        details[mat] = e
+
+                detail = details[mat]
+                if isinstance(detail, Exception):
                     issues.append(
                         ValidationIssue(
                             "MAT_LOOKUP_FAIL",
                             "BLOCK",
-                            f"Material lookup failed for {mat}: {e}",
+                            f"Material lookup failed for {mat}: {detail}",
                             "MATERIAL",
                             item_number=itm_no,
                         )
                     )
+                    continue
+
+                desc, base_uom, matl_group = detail
+                out[itm_no] = MaterialInfo(
+                    material=mat,
+                    description=desc,
+                    uom=base_uom,
+                    material_group=matl_group,
+                    plant=plant,
+                    status="ACTIVE",
+                )
 
             return out, issues
-        finally:
-            if conn is not None:
-                try:
-                    conn.close()
-                except Exception:
-                    pass
 
     def _ecc_validate_pricing(
         self, sold_to: str, items: List[Dict[str, Any]], currency: str
@@ -1,20 +1,49 @@
 from __future__ import annotations
 
+import sqlite3
+import threading
 import uuid
-from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Generator, List, Optional
 
 from ordra.db.sqlite import SQLiteDB
 
+_HITL_META_COLUMNS = "task_id, job_id, status, role, created_at, updated_at"
+_HITL_COLUMNS = f"{_HITL_META_COLUMNS}, payload_json, decision_json"
+
 
 class JobService:
     def __init__(self, db: SQLiteDB) -> None:
         self.db = db
+        self._local = threading.local()
+
+    # ---------- Connection ----------
+    @contextmanager
+    def _connect(self) -> Generator[sqlite3.Connection, None, None]:
+        """
+        Per-thread connection kept open across calls; each block commits or rolls back.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.db.open()
+            self._local.conn = conn
+        with conn:
+            yield conn
+
+    def close(self) -> None:
+        """
+        Closes the calling thread's connection (reopened on next use).
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
 
     # ---------- Jobs ----------
     def create_job(self, job_input: Dict[str, Any]) -> Dict[str, Any]:
         job_id = f"J-{uuid.uuid4().hex[:10]}"
         now = self.db.now()
-        with self.db.connect() as conn:
+        with self._connect() as conn:
             conn.execute(
                 """
                 INSERT INTO jobs(job_id, status, created_at, updated_at, input_json, output_json)
@@ -25,8 +54,14 @@ class JobService:
         return {"job_id": job_id, "status": "CREATED"}
 
     def get_job(self, job_id: str) -> Dict[str, Any]:
-        with self.db.connect() as conn:
-            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT job_id, status, created_at, updated_at, input_json, output_json
+                FROM jobs WHERE job_id = ?
+                """,
+                (job_id,),
+            ).fetchone()
             if not row:
                 raise KeyError("Job not found")
             return {
@@ -40,7 +75,7 @@ class JobService:
 
     def update_job_status(self, job_id: str, status: str) -> None:
         now = self.db.now()
-        with self.db.connect() as conn:
+        with self._connect() as conn:
             conn.execute(
                 "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
                 (status, now, job_id),
@@ -48,21 +83,22 @@ class JobService:
 
     def save_job_outputs(self, job_id: str, outputs: Dict[str, Any], status: Optional[str] = None) -> None:
         now = self.db.now()
-        with self.db.connect() as conn:
-            conn.execute(
-                "UPDATE jobs SET output_json = ?, updated_at = ? WHERE job_id = ?",
-                (self.db.dumps(outputs), now, job_id),
-            )
+        with self._connect() as conn:
             if status:
                 conn.execute(
-                    "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
-                    (status, now, job_id),
+                    "UPDATE jobs SET output_json = ?, status = ?, updated_at = ? WHERE job_id = ?",
+                    (self.db.dumps(outputs), status, now, job_id),
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET output_json = ?, updated_at = ? WHERE job_id = ?",
+                    (self.db.dumps(outputs), now, job_id),
                 )
 
     # ---------- Audits ----------
     def save_audit(self, job_id: str, audit: Dict[str, Any]) -> None:
         now = self.db.now()
-        with self.db.connect() as conn:
+        with self._connect() as conn:
             conn.execute(
                 """
                 INSERT INTO audits(job_id, created_at, audit_json)
@@ -75,8 +111,8 @@ class JobService:
             )
 
     def get_audit(self, job_id: str) -> Dict[str, Any]:
-        with self.db.connect() as conn:
-            row = conn.execute("SELECT * FROM audits WHERE job_id = ?", (job_id,)).fetchone()
+        with self._connect() as conn:
+            row = conn.execute("SELECT audit_json FROM audits WHERE job_id = ?", (job_id,)).fetchone()
             if not row:
                 raise KeyError("Audit not found")
             return self.db.loads(row["audit_json"])
@@ -92,7 +128,7 @@ class JobService:
             "ship_to_id": "200987"
           }
         """
-        with self.db.connect() as conn:
+        with self._connect() as conn:
             row = conn.execute(
                 """
                 SELECT decision_json
@@ -119,10 +155,30 @@ class JobService:
         Task shape expected:
           - task_id, job_id, status, role, created_at, payload, decision(optional)
         """
+        self.upsert_hitl_tasks([task])
+
+    def upsert_hitl_tasks(self, tasks: List[Dict[str, Any]]) -> None:
+        """
+        Upserts several tasks (same shape as upsert_hitl_task) in one transaction.
+        """
+        if not tasks:
+            return
         now = self.db.now()
-        decision = task.get("decision")
-        with self.db.connect() as conn:
-            conn.execute(
+        params = [
+            (
+                task["task_id"],
+                task["job_id"],
+                task["status"],
+                task.get("role") or "CS",
+                task.get("created_at") or now,
+                now,
+                self.db.dumps(task.get("payload") or {}),
+                self.db.dumps(task["decision"]) if task.get("decision") is not None else None,
+            )
+            for task in tasks
+        ]
+        with self._connect() as conn:
+            conn.executemany(
                 """
                 INSERT INTO hitl_tasks(task_id, job_id, status, role, created_at, updated_at, payload_json, decision_json)
                 VALUES(?,?,?,?,?,?,?,?)
@@ -133,22 +189,13 @@ class JobService:
                     payload_json = excluded.payload_json,
                     decision_json = excluded.decision_json
                 """,
-                (
-                    task["task_id"],
-                    task["job_id"],
-                    task["status"],
-                    task.get("role") or "CS",
-                    task.get("created_at") or now,
-                    now,
-                    self.db.dumps(task.get("payload") or {}),
-                    self.db.dumps(decision) if decision is not None else None,
-                ),
+                params,
             )
 
     def list_open_hitl_tasks(self) -> List[Dict[str, Any]]:
-        with self.db.connect() as conn:
+        with self._connect() as conn:
             rows = conn.execute(
-                "SELECT * FROM hitl_tasks WHERE status = 'OPEN' ORDER BY created_at DESC"
+                f"SELECT {_HITL_COLUMNS} FROM hitl_tasks WHERE status = 'OPEN' ORDER BY created_at DESC"
             ).fetchall()
             out: List[Dict[str, Any]] = []
             for r in rows:
@@ -166,9 +213,19 @@ class JobService:
                 )
             return out
 
+    def list_open_hitl_tasks_lite(self) -> List[Dict[str, Any]]:
+        """
+        Open tasks without payload/decision, for list views; fetch one with get_hitl_task().
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {_HITL_META_COLUMNS} FROM hitl_tasks WHERE status = 'OPEN' ORDER BY created_at DESC"
+            ).fetchall()
+            return [dict(r) for r in rows]
+
     def get_hitl_task(self, task_id: str) -> Dict[str, Any]:
-        with self.db.connect() as conn:
-            r = conn.execute("SELECT * FROM hitl_tasks WHERE task_id = ?", (task_id,)).fetchone()
+        with self._connect() as conn:
+            r = conn.execute(f"SELECT {_HITL_COLUMNS} FROM hitl_tasks WHERE task_id = ?", (task_id,)).fetchone()
             if not r:
                 raise KeyError("Task not found")
             return {
@@ -184,7 +241,7 @@ class JobService:
 
     def complete_hitl_task(self, task_id: str, status: str, decision: Dict[str, Any]) -> Dict[str, Any]:
         now = self.db.now()
-        with self.db.connect() as conn:
+        with self._connect() as conn:
             row = conn.execute("SELECT job_id, role, payload_json FROM hitl_tasks WHERE task_id = ?", (task_id,)).fetchone()
             if not row:
                 raise KeyError("Task not found")
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import yaml
+
+# BaseLoader keeps every scalar a string (no yes/no -> bool, 0001 -> int), like the line parser.
+try:
+    from yaml import CBaseLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import BaseLoader as _YamlLoader
+
 
 @dataclass
 class Skill:
@@ -25,6 +34,17 @@ def _parse_frontmatter(md: str) -> Tuple[Dict[str, Any], str]:
     fm_raw = parts[1].strip()
     body = parts[2].strip()
 
+    try:
+        meta = yaml.load(fm_raw, Loader=_YamlLoader) or {}
+    except yaml.YAMLError:
+        meta = None
+    if isinstance(meta, dict):
+        return meta, body
+    return _parse_frontmatter_lines(fm_raw), body
+
+
+def _parse_frontmatter_lines(fm_raw: str) -> Dict[str, Any]:
+    """Lenient key: value fallback for frontmatter that is not valid YAML."""
     meta: Dict[str, Any] = {}
     for line in fm_raw.splitlines():
         if ":" not in line:
@@ -42,7 +62,36 @@ def _parse_frontmatter(md: str) -> Tuple[Dict[str, Any], str]:
             meta[k] = items
         else:
             meta[k] = v.strip('"').strip("'")
-    return meta, body
+    return meta
+
+
+def _load_skill(p: Path) -> Skill:
+    md = p.read_text(encoding="utf-8")
+    meta, body = _parse_frontmatter(md)
+    name = str(meta.get("name") or p.stem)
+    desc = str(meta.get("description") or "")
+    triggers = meta.get("intent_triggers") or []
+    if isinstance(triggers, str):
+        triggers = [triggers]
+    triggers = [str(x) for x in triggers]
+    return Skill(name=name, description=desc, intent_triggers=triggers, md_text=body)
+
+
+@lru_cache(maxsize=8)
+def _load_all_cached(dir_str: str, fingerprint: Tuple[Tuple[str, int], ...]) -> Tuple[Skill, ...]:
+    """Parsed skills per (dir, file names + mtimes); the Skill objects are shared, treat as read-only."""
+    base = Path(dir_str)
+    return tuple(_load_skill(base / name) for name, _ in fingerprint)
+
+
+@lru_cache(maxsize=8)
+def _trigger_index(dir_str: str, fingerprint: Tuple[Tuple[str, int], ...]) -> Dict[str, Tuple[int, ...]]:
+    """Lowercased trigger -> positions (load order) of the skills carrying it."""
+    index: Dict[str, List[int]] = {}
+    for pos, s in enumerate(_load_all_cached(dir_str, fingerprint)):
+        for t in {t.lower() for t in s.intent_triggers}:
+            index.setdefault(t, []).append(pos)
+    return {t: tuple(v) for t, v in index.items()}
 
 
 class SkillLoader:
@@ -53,22 +102,14 @@ class SkillLoader:
     def __init__(self, skills_dir: Optional[str] = None):
         self.skills_dir = Path(skills_dir) if skills_dir else Path(__file__).resolve().parent
 
+    def _fingerprint(self) -> Tuple[Tuple[str, int], ...]:
+        # One stat per file; files are only re-read when a name or mtime changes.
+        return tuple((p.name, p.stat().st_mtime_ns) for p in sorted(self.skills_dir.glob("*.md")))
+
     def load_all(self) -> List[Skill]:
-        skills: List[Skill] = []
         if not self.skills_dir.exists():
-            return skills
-
-        for p in sorted(self.skills_dir.glob("*.md")):
-            md = p.read_text(encoding="utf-8")
-            meta, body = _parse_frontmatter(md)
-            name = str(meta.get("name") or p.stem)
-            desc = str(meta.get("description") or "")
-            triggers = meta.get("intent_triggers") or []
-            if isinstance(triggers, str):
-                triggers = [triggers]
-            triggers = [str(x) for x in triggers]
-            skills.append(Skill(name=name, description=desc, intent_triggers=triggers, md_text=body))
-        return skills
+            return []
+        return list(_load_all_cached(str(self.skills_dir), self._fingerprint()))
 
     def select_skills(
         self,
@@ -83,35 +124,25 @@ class SkillLoader:
           - issue-specific skills: trigger like "issue:MAT_UNMAPPED"
           - doc-quality skills: trigger like "doc:scanned_poor"
         """
+        if not self.skills_dir.exists():
+            return []
         issue_codes = issue_codes or []
-        all_skills = self.load_all()
-
-        wanted = []
-        for s in all_skills:
-            trig = [t.lower() for t in s.intent_triggers]
-
-            if customer_hint and f"customer:{customer_hint.lower()}" in trig:
-                wanted.append(s)
-                continue
-
-            if doc_quality and f"doc:{doc_quality.lower()}" in trig:
-                wanted.append(s)
-                continue
-
-            for code in issue_codes:
-                if f"issue:{str(code).lower()}" in trig:
-                    wanted.append(s)
-                    break
-
-        # de-dup by name
-        seen = set()
-        out = []
-        for s in wanted:
-            if s.name in seen:
-                continue
-            seen.add(s.name)
-            out.append(s)
-        return out
+        dir_str, fingerprint = str(self.skills_dir), self._fingerprint()
+        all_skills = _load_all_cached(dir_str, fingerprint)
+        index = _trigger_index(dir_str, fingerprint)
+
+        keys = [f"issue:{str(code).lower()}" for code in issue_codes]
+        if customer_hint:
+            keys.append(f"customer:{customer_hint.lower()}")
+        if doc_quality:
+            keys.append(f"doc:{doc_quality.lower()}")
+        hits = {pos for k in keys for pos in index.get(k, ())}
+
+        # load order, de-dup by name (first occurrence wins)
+        by_name: Dict[str, Skill] = {}
+        for pos in sorted(hits):
+            by_name.setdefault(all_skills[pos].name, all_skills[pos])
+        return list(by_name.values())
 
     @staticmethod
     def render_skills_block(skills: List[Skill]) -> str:
@@ -5,14 +5,43 @@ Loaded into prompt context based on customer_candidate, doc_type, issue_code.
 
 from __future__ import annotations
 
+import stat
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+# Always included, in this order, when present.
+_FIXED = ("order_policy.md", "sap_validation_rules.md", "ocr_playbook.md")
 
 
 def _default_skills_dir() -> Path:
     return Path(__file__).resolve().parent / "content"
 
 
+def _file_mtime(p: Path) -> Optional[int]:
+    """mtime_ns of a regular file, None if missing (or not a file)."""
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns if stat.S_ISREG(st.st_mode) else None
+
+
+@lru_cache(maxsize=8)
+def _fixed_parts(base_str: str, mtimes: Tuple[Optional[int], ...]) -> Tuple[str, ...]:
+    """Stripped text of the _FIXED files; re-read only when one is added, removed or modified."""
+    base = Path(base_str)
+    parts: List[str] = []
+    for name, mtime in zip(_FIXED, mtimes):
+        if mtime is None:
+            continue
+        try:
+            parts.append((base / name).read_text(encoding="utf-8").strip())
+        except Exception:
+            pass
+    return tuple(parts)
+
+
 def load_skills_for_context(
     customer_id: Optional[str] = None,
     doc_type: Optional[str] = None,
@@ -30,21 +59,14 @@ def load_skills_for_context(
     if not base.is_dir():
         return ""
 
-    parts: List[str] = []
-
-    # Always include order_policy and sap_validation_rules if present
-    for name in ("order_policy.md", "sap_validation_rules.md", "ocr_playbook.md"):
-        p = base / name
-        if p.is_file():
-            try:
-                parts.append(p.read_text(encoding="utf-8").strip())
-            except Exception:
-                pass
+    # Always include order_policy, sap_validation_rules and ocr_playbook if present
+    parts: List[str] = list(_fixed_parts(str(base), tuple(_file_mtime(base / name) for name in _FIXED)))
 
     # Customer-specific layout hints
     if customer_id:
         safe_id = customer_id.replace(" ", "_").upper()
-        for candidate in (base / f"customer_{safe_id}.md", base / f"customer_{safe_id.lower()}.md"):
+        for name in dict.fromkeys((f"customer_{safe_id}.md", f"customer_{safe_id.lower()}.md")):
+            candidate = base / name
             if candidate.is_file():
                 try:
                     parts.append(f"[Customer layout hints - {customer_id}]\n" + candidate.read_text(encoding="utf-8").strip())
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
 from ordra.trust.evaluator import CustomerTrustEvaluator
-from ordra.trust.trust_score import TrustScoreEngine, tier_from_score
+from ordra.trust.trust_score import TrustScoreEngine, load_trust_config, tier_from_score
 
-__all__ = ["CustomerTrustEvaluator", "TrustScoreEngine", "tier_from_score"]
+__all__ = ["CustomerTrustEvaluator", "TrustScoreEngine", "load_trust_config", "tier_from_score"]
@@ -3,9 +3,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
-import yaml
-
-from ordra.trust.trust_score import TrustScoreEngine, tier_from_score
+from ordra.trust.trust_score import TrustScoreEngine, load_trust_config, tier_from_score
 
 
 class CustomerTrustEvaluator:
@@ -17,12 +15,16 @@ class CustomerTrustEvaluator:
         episode_store: Any,
         decay_path: str | None = None,
     ) -> None:
-        path = Path(trust_path)
-        self.tiers = {}
-        if path.is_file():
-            with open(path, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f) or {}
-            self.tiers = data.get("tiers", {})
+        data = load_trust_config(Path(trust_path))
+        self.tiers = data.get("tiers", {}) if data is not None else {}
+        # Highest threshold first; on equal thresholds the tier listed later wins.
+        self._tier_ladder: List[Tuple[int, str]] = [
+            (thr, tier)
+            for thr, _, tier in sorted(
+                ((cfg.get("min_clean_episodes", 0), i, tier) for i, (tier, cfg) in enumerate(self.tiers.items())),
+                reverse=True,
+            )
+        ]
         self.store = episode_store
         self.decay_engine = TrustScoreEngine.from_yaml(decay_path) if decay_path and Path(decay_path).is_file() else None
 
@@ -38,13 +40,9 @@ class CustomerTrustEvaluator:
             score = self.decay_engine.compute_score(recipes)
             return tier_from_score(score), score
 
-        clean = [
-            e for e in recipes
+        clean_count = sum(
+            1 for e in recipes
             if e.get("outcome") == "AUTO_POST" and not e.get("human_overrides_used")
-        ]
-        clean_count = len(clean)
-        current = "BRONZE"
-        for tier, cfg in self.tiers.items():
-            if clean_count >= cfg.get("min_clean_episodes", 0):
-                current = tier
+        )
+        current = next((tier for thr, tier in self._tier_ladder if clean_count >= thr), "BRONZE")
         return current, clean_count
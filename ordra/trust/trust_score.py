@@ -1,13 +1,32 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Type, TypeVar
+from typing import Any, Dict, List, Optional, Type, TypeVar
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
 T = TypeVar("T", bound="TrustScoreEngine")
 
 
+@lru_cache(maxsize=16)
+def _load_yaml_cached(path_str: str, mtime_ns: int) -> Any:
+    with open(path_str, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
+
+def load_trust_config(path: Path) -> Optional[Any]:
+    """Parsed trust config, cached per (path, mtime_ns) and shared (read-only); None if not a file."""
+    if not path.is_file():
+        return None
+    return _load_yaml_cached(str(path), path.stat().st_mtime_ns)
+
+
 def tier_from_score(score: int) -> str:
     """Map numeric trust score to tier."""
     if score >= 90:
@@ -23,29 +42,30 @@ class TrustScoreEngine:
     def __init__(self, decay_cfg: Dict[str, Any]) -> None:
         self.decay = decay_cfg.get("decay_rules", [])
         self.floor = decay_cfg.get("floor", {}).get("minimum_score", 0)
+        # First rule per trigger wins, as with the old linear scan.
+        self._penalties: Dict[str, int] = {}
+        for r in self.decay:
+            self._penalties.setdefault(r.get("trigger"), int(r.get("penalty", 0)))
+        self._p_hitl = self._penalty("HITL_OVERRIDE")
+        self._p_err = self._penalty("AUTO_POST_ERROR")
 
     @classmethod
     def from_yaml(cls: Type[T], path: str) -> T:
-        p = Path(path)
-        if not p.is_file():
-            return cls({})
-        with open(p, "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f) or {}
-        return cls(cfg)
+        cfg = load_trust_config(Path(path))
+        return cls(cfg if cfg is not None else {})
 
     def compute_score(self, episodes: List[Dict[str, Any]]) -> int:
-        score = 100
+        # Penalties are fixed per trigger, so the score only depends on two counts.
+        overrides = errors = 0
         for e in episodes:
             if e.get("outcome") != "AUTO_POST":
                 continue
             if e.get("human_overrides_used"):
-                score -= self._penalty("HITL_OVERRIDE")
+                overrides += 1
             if e.get("sap_post_failed"):
-                score -= self._penalty("AUTO_POST_ERROR")
+                errors += 1
+        score = 100 - overrides * self._p_hitl - errors * self._p_err
         return max(score, self.floor)
 
     def _penalty(self, trigger: str) -> int:
-        for r in self.decay:
-            if r.get("trigger") == trigger:
-                return int(r.get("penalty", 0))
-        return 0
+        return self._penalties.get(trigger, 0)
@@ -2,17 +2,24 @@
 from __future__ import annotations
 
 import json
+from collections import Counter
 from typing import Any, Dict, List
 
+try:
+    import orjson
+except ImportError:  # optional C accelerator; stdlib json is the fallback
+    orjson = None
+
 
 def summarize_issues(issues: List[Dict[str, Any]]) -> Dict[str, int]:
-    out = {"BLOCK": 0, "WARN": 0, "INFO": 0}
-    for i in issues or []:
-        sev = (i.get("severity") or "INFO").upper()
-        if sev in out:
-            out[sev] += 1
-    return out
+    c = Counter((i.get("severity") or "INFO").upper() for i in issues or [])
+    return {"BLOCK": c["BLOCK"], "WARN": c["WARN"], "INFO": c["INFO"]}
 
 
 def pretty_json(obj: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str).decode()
+        except orjson.JSONEncodeError:
+            pass  # e.g. ints beyond 64 bits; stdlib handles them
     return json.dumps(obj, indent=2, ensure_ascii=False, default=str)
@@ -20,3 +20,11 @@ def test_build_graph():
     assert "ingest_email" in g.nodes
     assert ("ingest_email", "detect_customer") in g.edges
     assert nx.is_directed_acyclic_graph(g)
+
+
+def test_build_graph_with_opcodes():
+    path = Path(__file__).resolve().parent.parent / "ordra" / "orchestration" / "dag_spec.yaml"
+    g = build_graph_from_yaml(str(path), opcodes={"email.fetch_and_normalize": 0})
+    assert g.nodes["ingest_email"]["opcode"] == 0
+    assert g.nodes["detect_customer"]["opcode"] == -1
+    assert "opcode" not in build_graph_from_yaml(str(path)).nodes["ingest_email"]
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from ordra.connectors.o365_client import AttachmentFile
+from ordra.runtime import handlers
+from ordra.runtime.handlers import runtime_bundle
+
+
+class FakeMailbox:
+    def __init__(self, files):
+        self.files = files
+
+    def download_file_attachments(self, message_id):
+        return self.files
+
+
+def _attachments_ctx(files, **runtime):
+    runtime["o365_client"] = FakeMailbox(files)
+    return {"email_message": {"message_id": "m1"}, "_rt": runtime_bundle(runtime)}
+
+
+def test_attachments_spool_under_job_dir(tmp_path):
+    files = [
+        AttachmentFile(name="po.pdf", content_type="application/pdf", bytes_data=b"%PDF-1"),
+        AttachmentFile(name="lines.csv", content_type="text/csv", bytes_data=b"a,b"),
+        AttachmentFile(name="logo.png", content_type="image/png", bytes_data=b"png"),
+    ]
+    out = handlers.mailbox_o365_attachments(_attachments_ctx(files, spool_dir=str(tmp_path)), None)
+    assert os.path.dirname(out["attachment_dir"]) == str(tmp_path)
+    assert [f["name"] for f in out["pdf_files"]] == ["po.pdf"]
+    assert [f["name"] for f in out["excel_files"]] == ["lines.csv"]
+    with open(out["pdf_files"][0]["path"], "rb") as fh:
+        assert fh.read() == b"%PDF-1"
+    assert sorted(os.listdir(out["attachment_dir"])) == ["00_po.pdf", "01_lines.csv"]
+
+
+def test_attachments_without_kept_files_create_no_dir(tmp_path):
+    files = [AttachmentFile(name="logo.png", content_type="image/png", bytes_data=b"png")]
+    out = handlers.mailbox_o365_attachments(_attachments_ctx(files, spool_dir=str(tmp_path)), None)
+    assert out == {"pdf_files": [], "excel_files": [], "attachment_dir": None}
+    assert os.listdir(tmp_path) == []
+
+
+def test_rt_is_read_only():
+    runtime = {"db": None}
+    ctx = {"_runtime": runtime}
+    assert handlers._rt(ctx) == handlers.RuntimeBundle()
+    assert runtime == {"db": None} and "_rt" not in ctx
+
+
+def test_hitl_task_is_recorded_in_shared_tasks():
+    tasks = {}
+    ctx = {"job_id": "J-1", "decision": {"required_human_role": "FINANCE"}, "_rt": runtime_bundle({"hitl_tasks": tasks})}
+    task_id = handlers.hitl_create_task_if_needed(ctx, None)["hitl_task_id"]
+    assert tasks[task_id]["role"] == "FINANCE" and tasks[task_id]["status"] == "OPEN"
+    assert handlers.hitl_create_task_if_needed({"job_id": "J-2"}, None)["hitl_task_id"].startswith("T-")
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "   ", "abc", "  abc \n", " " * 200, "\n" * 70 + "x", "x" + "\t" * 70, " " * 64 + "x" * 200 + " " * 64, "y" * 500],
+)
+def test_stripped_len_matches_strip(text):
+    assert handlers._stripped_len(text) == len(text.strip())
+    assert handlers._stripped_len(text, window=4) == len(text.strip())
+
+
+def _reference_quality(pdf_text, ocr_text, has_pdf):
+    pdf_len = len(pdf_text.strip())
+    if ocr_text or (pdf_len < 50 and has_pdf):
+        if pdf_len < 20:
+            return "scanned_poor", ["ocr_strong", "table_extractor"]
+        return "scanned_good", ["ocr_fast"]
+    return "digital", ["pdf_text_extract"]
+
+
+@pytest.mark.parametrize("pdf_text", ["", "  short  ", "x" * 30, " " * 100 + "x" * 30, "x" * 80])
+@pytest.mark.parametrize("ocr_text", ["", "ocr"])
+@pytest.mark.parametrize("has_pdf", [False, True])
+def test_doc_quality_table_matches_branching(pdf_text, ocr_text, has_pdf):
+    ctx = {"pdf_text": pdf_text, "ocr_text": ocr_text, "has_pdf_attachment": has_pdf}
+    out = handlers.documents_doc_quality_router(ctx, None)
+    assert (out["doc_quality"], out["preprocess_plan"]) == _reference_quality(pdf_text, ocr_text, has_pdf)
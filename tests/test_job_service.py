@@ -0,0 +1,88 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+import pytest
+
+from ordra.db.sqlite import SQLiteDB
+from ordra.runtime import handlers
+from ordra.runtime.handlers import runtime_bundle
+from ordra.services.job_service import JobService
+
+
+@pytest.fixture
+def svc(tmp_path):
+    db = SQLiteDB(str(tmp_path / "ordra.db"))
+    db.init()
+    svc = JobService(db)
+    yield svc
+    svc.close()
+
+
+def test_handler_and_service_timestamps_share_one_format(svc):
+    tasks = {}
+    ctx = {"job_id": "J-1", "decision": {}, "_rt": runtime_bundle({"hitl_tasks": tasks})}
+    handlers.hitl_create_task_if_needed(ctx, None)
+    svc.upsert_hitl_tasks(list(tasks.values()))
+    (row,) = svc.list_open_hitl_tasks_lite()
+    created, updated = row["created_at"], row["updated_at"]
+    assert len(created) == len(updated)
+    assert datetime.fromisoformat(created).utcoffset() == datetime.fromisoformat(updated).utcoffset()
+    assert created <= updated
+
+
+def test_connection_is_reused_per_thread(svc, monkeypatch):
+    opened = []
+    real_open = svc.db.open
+    monkeypatch.setattr(svc.db, "open", lambda: opened.append(threading.get_ident()) or real_open())
+
+    job_id = svc.create_job({"n": 1})["job_id"]
+    svc.update_job_status(job_id, "RUNNING")
+    assert len(opened) == 1
+
+    seen = []
+    worker = threading.Thread(target=lambda: seen.append(svc.get_job(job_id)["status"]) or svc.close())
+    worker.start()
+    worker.join()
+    assert seen == ["RUNNING"] and len(opened) == 2 and opened[1] != opened[0]
+
+    svc.close()
+    assert svc.get_job(job_id)["status"] == "RUNNING" and len(opened) == 3
+
+
+def test_failed_block_rolls_back_and_keeps_connection(svc):
+    job_id = svc.create_job({})["job_id"]
+    with pytest.raises(RuntimeError):
+        with svc._connect() as conn:
+            conn.execute("UPDATE jobs SET status = 'BROKEN' WHERE job_id = ?", (job_id,))
+            raise RuntimeError("boom")
+    assert svc.get_job(job_id)["status"] == "CREATED"
+
+
+def test_upsert_hitl_tasks_inserts_and_updates_in_bulk(svc):
+    svc.upsert_hitl_tasks([])
+    svc.upsert_hitl_tasks([
+        {"task_id": "T-1", "job_id": "J-1", "status": "OPEN", "created_at": "2026-01-01T00:00:00.000000+00:00", "payload": {"a": 1}},
+        {"task_id": "T-2", "job_id": "J-1", "status": "OPEN", "role": "FINANCE"},
+    ])
+    t1 = svc.get_hitl_task("T-1")
+    assert (t1["role"], t1["payload"], t1["decision"]) == ("CS", {"a": 1}, None)
+    assert svc.get_hitl_task("T-2")["payload"] == {}
+
+    svc.upsert_hitl_tasks([
+        {"task_id": "T-1", "job_id": "J-1", "status": "APPROVED", "role": "FINANCE",
+         "created_at": "2026-06-01T00:00:00.000000+00:00", "decision": {"ok": True}},
+        {"task_id": "T-3", "job_id": "J-2", "status": "OPEN"},
+    ])
+    t1 = svc.get_hitl_task("T-1")
+    assert (t1["status"], t1["role"], t1["decision"]) == ("APPROVED", "FINANCE", {"ok": True})
+    assert t1["created_at"] == "2026-01-01T00:00:00.000000+00:00"  # kept from the first insert
+    assert sorted(t["task_id"] for t in svc.list_open_hitl_tasks_lite()) == ["T-2", "T-3"]
+
+
+def test_upsert_hitl_tasks_is_one_transaction(svc):
+    with pytest.raises(KeyError):
+        svc.upsert_hitl_tasks([{"task_id": "T-1", "job_id": "J-1", "status": "OPEN"}, {"task_id": "T-2", "job_id": "J-1"}])
+    with pytest.raises(sqlite3.IntegrityError):  # NOT NULL status, second row
+        svc.upsert_hitl_tasks([{"task_id": "T-1", "job_id": "J-1", "status": "OPEN"}, {"task_id": "T-2", "job_id": "J-1", "status": None}])
+    assert svc.list_open_hitl_tasks_lite() == []
@@ -0,0 +1,147 @@
+import base64
+
+import pytest
+
+from ordra.connectors.o365_client import O365Client, O365Config
+from ordra.runtime import handlers
+from ordra.runtime.handlers import runtime_bundle
+
+GRAPH = "https://graph.test/v1.0"
+MSG_PATH = f"{GRAPH}/users/orders@acme.com/messages/m1/attachments"
+
+
+class FakeResponse:
+    def __init__(self, body, status_code=200):
+        self._body = body
+        self.status_code = status_code
+        self.text = str(body)
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    """requests.Session stand-in: GET responses keyed by URL, every call recorded."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.gets = []
+
+    def post(self, url, **kw):
+        return FakeResponse({"access_token": "t", "expires_in": 3600})
+
+    def get(self, url, params=None, **kw):
+        self.gets.append((url, params))
+        return FakeResponse(self.routes[url])
+
+
+def _client(routes, **cfg):
+    sess = FakeSession(routes)
+    config = O365Config(tenant_id="t", client_id="c", client_secret="s", mailbox="orders@acme.com", graph_base=GRAPH, **cfg)
+    return O365Client(config, session=sess), sess
+
+
+def _att(att_id, name, data, inline=True):
+    a = {
+        "@odata.type": "#microsoft.graph.fileAttachment",
+        "id": att_id,
+        "name": name,
+        "contentType": "application/pdf",
+        "size": len(data),
+    }
+    if inline:
+        a["contentBytes"] = base64.b64encode(data).decode()
+    return a
+
+
+def _fetched(sess):
+    return sorted(url.rsplit("/", 1)[1] for url, _ in sess.gets if url != MSG_PATH)
+
+
+@pytest.fixture
+def attachments():
+    listing = [_att(f"a{i}", f"po{i}.pdf", bytes([i]) * 100, inline=i % 2 == 0) for i in range(6)]
+    routes = {MSG_PATH: {"value": listing}}
+    for a in listing:
+        routes[f"{MSG_PATH}/{a['id']}"] = {"contentBytes": base64.b64encode(bytes([int(a["id"][1:])]) * 100).decode()}
+    return routes
+
+
+def test_download_fetches_only_attachments_within_max_files(attachments):
+    client, sess = _client(attachments)
+    files = client.download_file_attachments("m1", max_files=3)
+    assert [f.name for f in files] == ["po0.pdf", "po1.pdf", "po2.pdf"]
+    assert files[1].bytes_data == bytes([1]) * 100
+    assert _fetched(sess) == ["a1"]
+
+
+def test_download_fetches_only_attachments_within_byte_budget(attachments):
+    client, sess = _client(attachments)
+    files = client.download_file_attachments("m1", max_total_bytes=450)
+    assert [f.name for f in files] == ["po0.pdf", "po1.pdf", "po2.pdf", "po3.pdf"]
+    assert _fetched(sess) == ["a1", "a3"]
+
+
+FOLDERS = f"{GRAPH}/users/orders@acme.com/mailFolders"
+INBOX = f"{FOLDERS}/inbox-id/messages"
+PAGE2 = f"{GRAPH}/next-page-2"
+PAGE3 = f"{GRAPH}/next-page-3"
+
+
+def _msg(msg_id, subject="PO order"):
+    return {"id": msg_id, "subject": subject, "from": {"emailAddress": {"address": "a@acme.com"}}}
+
+
+def _mailbox(pages):
+    routes = {FOLDERS: {"value": [{"id": "inbox-id", "displayName": "Inbox"}]}}
+    routes.update(pages)
+    return _client(routes)
+
+
+def _pages_fetched(sess):
+    return [url for url, _ in sess.gets if url != FOLDERS]
+
+
+def test_search_exhausted_pages_have_no_next_link():
+    client, sess = _mailbox({
+        INBOX: {"value": [_msg("m1"), _msg("m2")], "@odata.nextLink": PAGE2},
+        PAGE2: {"value": [_msg("m3")]},
+    })
+    search = client.iter_messages(page_size=2)
+    assert [c.id for c in search] == ["m1", "m2", "m3"]
+    assert search.next_link is None
+    assert _pages_fetched(sess) == [INBOX, PAGE2]
+
+
+def test_search_partial_page_has_no_next_link():
+    client, sess = _mailbox({INBOX: {"value": [_msg("m1"), _msg("m2")], "@odata.nextLink": PAGE2}})
+    search = client.iter_messages(page_size=2)
+    it = iter(search)
+    assert next(it).id == "m1"
+    assert search.next_link is None  # resuming from PAGE2 would skip m2
+    assert next(it).id == "m2"
+    assert search.next_link == PAGE2
+    assert _pages_fetched(sess) == [INBOX]
+
+
+def test_search_filtered_rows_count_as_consumed():
+    client, sess = _mailbox({
+        INBOX: {"value": [_msg("m1"), _msg("m2", "newsletter")], "@odata.nextLink": PAGE2},
+        PAGE2: {"value": [_msg("m3", "invoice")], "@odata.nextLink": PAGE3},
+        PAGE3: {"value": [_msg("m4")]},
+    })
+    search = client.iter_messages(subject_contains=["po"], page_size=2)
+    it = iter(search)
+    assert next(it).id == "m1"
+    assert search.next_link == PAGE2  # m2 was filtered out, page 1 is done
+    assert next(it).id == "m4"  # page 2 had no match and is skipped entirely
+    assert search.next_link is None
+    assert _pages_fetched(sess) == [INBOX, PAGE2, PAGE3]
+
+
+def test_search_handler_fetches_one_message_for_top_candidate():
+    client, sess = _mailbox({INBOX: {"value": [_msg("m1")], "@odata.nextLink": PAGE2}})
+    out = handlers.mailbox_o365_search({"_rt": runtime_bundle({"o365_client": client})}, None)
+    assert out["email_message_id"] == "m1"
+    assert out["next_link"] == PAGE2
+    assert [params["$top"] for url, params in sess.gets if url == INBOX] == [1]
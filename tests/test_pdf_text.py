@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ordra.runtime import handlers
+
+pytest.importorskip("pypdfium2")
+canvas = pytest.importorskip("reportlab.pdfgen.canvas")
+
+
+@pytest.fixture
+def po_pdf(tmp_path):
+    path = tmp_path / "po.pdf"
+    c = canvas.Canvas(str(path))
+    for page in range(2):
+        y = 800
+        for line in ("PURCHASE ORDER PO-4711", "Sold-To 1040402", "Item 10 MAT-100001 Qty 5 EA"):
+            c.drawString(72, y, f"{line} p{page}")
+            y -= 20
+        c.showPage()
+    c.save()
+    return str(path)
+
+
+def test_pdfium_text_matches_pypdf(po_pdf):
+    pdfium_pages = list(handlers._iter_pdfium_pages(po_pdf))
+    pypdf_pages = list(handlers._iter_pypdf_pages(po_pdf))
+    assert len(pdfium_pages) == 2
+    assert not any("\r" in text for text in pdfium_pages)
+    assert [p.splitlines() for p in pdfium_pages] == [p.splitlines() for p in pypdf_pages]
+
+
+def test_pdfium_pages_from_threads(po_pdf):
+    with open(po_pdf, "rb") as fh:
+        data = fh.read()
+    expected = handlers._pdf_bytes_to_pages(data)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(handlers._pdf_bytes_to_pages, [data] * 8))
+    assert results == [expected] * 8
@@ -0,0 +1,55 @@
+import json
+
+from ordra.db.sqlite import SQLiteDB
+from ordra.runtime import handlers
+from ordra.runtime.run_job import run_job
+
+
+def test_run_job_outputs_are_json_serializable(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    out = run_job(
+        {
+            "email_from": "orders@acme.com",
+            "email_subject": "PO",
+            "email_body": "please ship",
+            "pdf_text": "PO12345 line 1 widget",
+        }
+    )
+    # Same fields /jobs/{id}/run persists via JobService.save_job_outputs
+    outputs = {
+        k: out.get(k)
+        for k in (
+            "extracted_order",
+            "validated_order",
+            "decision",
+            "hitl_task_id",
+            "decision_deck",
+            "_dag_exec",
+            "extracted_bapi",
+            "sap_bapi_payload",
+        )
+    }
+    assert out["_dag_exec"]["completed"]
+    assert json.loads(SQLiteDB.dumps(outputs))["_dag_exec"]["node_results"]
+
+
+def test_run_job_initialises_db_per_cwd(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    job = {"email_from": "orders@acme.com", "email_subject": "PO", "pdf_text": "PO12345 widget"}
+    for name in ("a", "b"):
+        cwd = tmp_path / name
+        cwd.mkdir()
+        monkeypatch.chdir(cwd)
+        run_job(dict(job))
+        with SQLiteDB(str(cwd / "ordra.db")).connect() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM revenue_events").fetchone()[0] == 1
+
+
+def test_run_job_dispatches_through_current_handlers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setitem(handlers._HANDLERS, "memory.faiss.retrieve_layout_hints", lambda ctx, spec: {"layout_hints": "patched"})
+    assert handlers.build_handlers() is not handlers._HANDLERS
+    out = run_job({"email_from": "orders@acme.com", "email_subject": "PO", "pdf_text": "PO12345 widget"})
+    assert out["layout_hints"] == "patched"
@@ -0,0 +1,107 @@
+import sys
+import types
+
+import pytest
+
+from ordra.sap import sap_client
+from ordra.sap.sap_client import SapClient
+
+
+class FakeSap:
+    """Fake pyrfc backend: creates are buffered per connection until committed."""
+
+    def __init__(self, bad=(), boom=(), commit_raises=False, logon_fails=False):
+        self.bad, self.boom = set(bad), set(boom)
+        self.commit_raises = commit_raises
+        self.logon_fails = logon_fails
+        self.logons = 0
+        self.creates = []
+        self.committed = []
+
+    def connection_cls(self):
+        sap = self
+
+        class Connection:
+            def __init__(self, **params):
+                sap.logons += 1
+                if sap.logon_fails:
+                    raise RuntimeError("logon failed")
+                self.pending = []
+
+            def ping(self):
+                pass
+
+            def close(self):
+                self.pending = []  # SAP rolls back an open LUW on logoff
+
+            def call(self, fn, **kw):
+                if fn == "BAPI_SALESORDER_CREATEFROMDAT2":
+                    po = kw["ORDER_HEADER_IN"]["PURCH_NO_C"]
+                    sap.creates.append(po)
+                    if po in sap.boom:
+                        raise RuntimeError("communication error")
+                    if po in sap.bad:
+                        return {"RETURN": [{"TYPE": "E", "MESSAGE": f"{po} rejected"}]}
+                    self.pending.append(po)
+                    return {"SALESDOCUMENT": f"SO-{po}"}
+                if fn == "BAPI_TRANSACTION_COMMIT":
+                    sap.committed.extend(self.pending)
+                    self.pending = []
+                    if sap.commit_raises:
+                        raise RuntimeError("timeout after commit")
+                elif fn == "BAPI_TRANSACTION_ROLLBACK":
+                    self.pending = []
+                return {}
+
+        return Connection
+
+
+@pytest.fixture
+def ecc(monkeypatch):
+    def install(**kw):
+        sap = FakeSap(**kw)
+        monkeypatch.setitem(sys.modules, "pyrfc", types.SimpleNamespace(Connection=sap.connection_cls()))
+        monkeypatch.setattr(sap_client, "_ECC_MISSING", [])
+        monkeypatch.setattr(sap_client, "_ECC_CONN_PARAMS", {})
+        monkeypatch.setattr(sap_client, "_RFC_POOL", None)
+        client = SapClient()
+        client.mode = "ecc"
+        return client, sap
+
+    return install
+
+
+def _payloads(*pos):
+    return [{"po_number": po, "items": []} for po in pos]
+
+
+def test_batch_bisects_around_failed_create(ecc):
+    client, sap = ecc(bad={"P3"}, boom={"P5"})
+    res = client.create_sales_orders(_payloads("P1", "P2", "P3", "P4", "P5", "P6"))
+    assert [r.ok for r in res] == [True, True, False, True, False, True]
+    assert res[2].error == "E:P3 rejected"
+    assert sorted(sap.committed) == ["P1", "P2", "P4", "P6"]
+
+
+def test_batch_commit_failure_is_not_retried(ecc):
+    client, sap = ecc(commit_raises=True)
+    res = client.create_sales_orders(_payloads("P1", "P2", "P3"))
+    assert sap.creates == ["P1", "P2", "P3"]
+    assert sap.committed == ["P1", "P2", "P3"]
+    assert [r.sales_order for r in res] == ["SO-P1", "SO-P2", "SO-P3"]
+    assert all(not r.ok and r.error.startswith("Commit status unknown") for r in res)
+
+
+def test_batch_logon_failure_is_not_retried(ecc):
+    client, sap = ecc(logon_fails=True)
+    res = client.create_sales_orders(_payloads("P1", "P2", "P3", "P4"))
+    assert sap.logons == 1
+    assert sap.creates == []
+    assert [r.error for r in res] == ["logon failed"] * 4
+
+
+def test_single_order_commit_failure_reports_unknown_status(ecc):
+    client, sap = ecc(commit_raises=True)
+    res = client.create_sales_order({"po_number": "P1", "items": []})
+    assert not res.ok and res.sales_order == "SO-P1"
+    assert res.error.startswith("Commit status unknown")
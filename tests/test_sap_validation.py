@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from ordra.sap import validation
+from ordra.sap.sap_client import SapClient
+from ordra.sap.validation import SapValidator
+
+
+def _write_stub(stub_dir, name, data, mtime_ns):
+    path = stub_dir / name
+    path.write_text(json.dumps(data), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def stub_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("SAP_MODE", "stub")
+    monkeypatch.setenv("SAP_STUB_DIR", str(tmp_path))
+    SapClient.reload_config()
+    yield tmp_path
+    monkeypatch.undo()
+    SapClient.reload_config()
+
+
+ITEMS = [{"ITM_NUMBER": "000010", "MATERIAL": "MAT-1"}, {"ITM_NUMBER": "000020", "MATERIAL": "MAT-2", "PLANT": "IN02"}]
+
+
+def test_stub_lookups_follow_file_edits(stub_dir):
+    _write_stub(stub_dir, "materials_demo.json", [
+        {"material": "MAT-1", "plant": "IN01", "status": "ACTIVE"},
+        {"material": "MAT-2", "status": "BLOCKED"},
+    ], 1_000_000_000)
+    _write_stub(stub_dir, "pricing_demo.json", {"conditions": [
+        {"material": "MAT-1", "condition_type": "PR00", "price": "10.5"},
+        {"material": "MAT-2", "condition_type": "K004", "price": 1},
+    ]}, 1_000_000_000)
+    v = SapValidator()
+
+    mats, issues = v.validate_materials(ITEMS)
+    assert sorted(mats) == ["000010", "000020"] and mats["000020"].plant == "IN02"  # plant-less row matches any plant
+    assert [(i.code, i.item_number) for i in issues] == [("MAT_INACTIVE", "000020")]
+    pricing = v.validate_pricing("1040402", ITEMS)
+    assert pricing.item_prices == {"000010": 10.5}
+    assert [(i.code, i.item_number) for i in pricing.issues] == [("PRICE_MISSING", "000020")]
+
+    misses = validation._load_stub_cached.cache_info().misses
+    v.validate_materials(ITEMS)
+    SapValidator().validate_pricing("1040402", ITEMS)
+    assert validation._load_stub_cached.cache_info().misses == misses  # unchanged files are not re-read
+
+    _write_stub(stub_dir, "materials_demo.json", [{"material": "MAT-2", "status": "ACTIVE"}], 2_000_000_000)
+    _write_stub(stub_dir, "pricing_demo.json", {"conditions": [{"material": "MAT-2", "condition_type": "PR00", "price": 3}]}, 2_000_000_000)
+    mats, issues = v.validate_materials(ITEMS)
+    assert sorted(mats) == ["000020"] and [i.code for i in issues] == ["MAT_NOT_FOUND"]
+    assert v.validate_pricing("1040402", ITEMS).item_prices == {"000020": 3.0}
+
+
+def test_missing_stub_files_report_issues(stub_dir):
+    v = SapValidator()
+    mats, issues = v.validate_materials(ITEMS)
+    assert mats == {} and [i.code for i in issues] == ["MAT_NOT_FOUND", "MAT_NOT_FOUND"]
+    assert [i.code for i in v.validate_pricing("1040402", ITEMS).issues] == ["PRICE_MISSING", "PRICE_MISSING"]
+    cust, issues = v.validate_customer("999", "999")
+    assert cust is None and [i.code for i in issues] == ["CUST_NOT_FOUND"]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_stub_parsing_with_and_without_orjson(stub_dir, monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(validation, "orjson", None)
+    cust = {"name1": "Acme Überseehandel", "sales_area": {"sales_org": "IN01"}, "partner_functions": {"ship_to": "2"}}
+    _write_stub(stub_dir, "customer_1.json", cust, 1_000_000_000)
+    info, issues = SapValidator().validate_customer("1", "2")
+    assert (info.name1, info.sales_org, issues) == ("Acme Überseehandel", "IN01", [])
+
+    # orjson rejects NaN; the stdlib fallback still reads such files
+    (stub_dir / "pricing_demo.json").write_text(
+        '{"conditions": [{"material": "MAT-1", "condition_type": "PR00", "price": NaN}, '
+        '{"material": "MAT-2", "condition_type": "PR00", "price": 2}]}'
+    )
+    prices = SapValidator().validate_pricing("1", ITEMS).item_prices
+    assert prices["000020"] == 2.0 and prices["000010"] != prices["000010"]
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from ordra.skills.loader import SkillLoader
+
+
+def _write_skill(path, name, triggers, body="body", mtime_ns=None):
+    path.write_text(f"---\nname: {name}\ndescription: {name} skill\nintent_triggers: [{', '.join(triggers)}]\n---\n{body}\n")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def skills_dir(tmp_path):
+    _write_skill(tmp_path / "a.md", "acme", ["customer:ACME_CORP"], mtime_ns=1_000_000_000)
+    _write_skill(tmp_path / "b.md", "mat", ["issue:MAT_UNMAPPED", "doc:scanned_poor"], mtime_ns=1_000_000_000)
+    return tmp_path
+
+
+def test_unchanged_files_reuse_parsed_skills(skills_dir):
+    first = SkillLoader(str(skills_dir)).load_all()
+    second = SkillLoader(str(skills_dir)).load_all()
+    assert [s.name for s in first] == ["acme", "mat"]
+    assert all(a is b for a, b in zip(first, second))
+
+
+def test_modified_or_added_files_are_reparsed(skills_dir):
+    loader = SkillLoader(str(skills_dir))
+    before = loader.load_all()
+    _write_skill(skills_dir / "b.md", "mat", ["issue:MAT_UNMAPPED"], body="new body", mtime_ns=2_000_000_000)
+    after = loader.load_all()
+    assert after[0] == before[0] and before[1].md_text == "body"
+    assert after[1].md_text == "new body"
+    _write_skill(skills_dir / "c.md", "credit", ["issue:CREDIT_BLOCK"])
+    assert [s.name for s in loader.load_all()] == ["acme", "mat", "credit"]
+
+
+def test_select_skills_matches_triggers_case_insensitively(skills_dir):
+    _write_skill(skills_dir / "c.md", "acme", ["doc:scanned_poor"])  # same name as a.md: first one wins
+    _write_skill(skills_dir / "d.md", "credit", ["Issue:Credit_Block"])
+    loader = SkillLoader(str(skills_dir))
+
+    picked = loader.select_skills(customer_hint="acme_corp", issue_codes=["credit_block", "MAT_UNMAPPED"])
+    assert [(s.name, s.md_text) for s in picked] == [("acme", "body"), ("mat", "body"), ("credit", "body")]
+    assert [s.name for s in loader.select_skills(customer_hint=None, doc_quality="SCANNED_POOR")] == ["mat", "acme"]
+    assert loader.select_skills(customer_hint="OTHER", issue_codes=["NOPE"], doc_quality="digital") == []
+
+
+def test_select_skills_index_follows_file_changes(skills_dir):
+    loader = SkillLoader(str(skills_dir))
+    assert loader.select_skills(customer_hint=None, issue_codes=["CREDIT_BLOCK"]) == []
+    _write_skill(skills_dir / "c.md", "credit", ["issue:CREDIT_BLOCK"])
+    assert [s.name for s in loader.select_skills(customer_hint=None, issue_codes=["CREDIT_BLOCK"])] == ["credit"]
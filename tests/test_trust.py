@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pytest
+
+from ordra.trust.evaluator import CustomerTrustEvaluator
+
+SHIPPED = str(Path(__file__).resolve().parent.parent / "ordra" / "trust" / "customer_trust.yaml")
+
+
+class FakeEpisodeStore:
+    def __init__(self, recipes):
+        self.recipes = recipes
+
+    def retrieve_recipes(self, customer_key, limit):
+        return {"recipes": self.recipes[:limit]}
+
+
+def _evaluator(trust_path, clean, overridden=0, other=0):
+    recipes = (
+        [{"outcome": "AUTO_POST"}] * clean
+        + [{"outcome": "AUTO_POST", "human_overrides_used": True}] * overridden
+        + [{"outcome": "CS_REVIEW"}] * other
+    )
+    return CustomerTrustEvaluator(trust_path, FakeEpisodeStore(recipes))
+
+
+@pytest.mark.parametrize(
+    "clean, tier",
+    [(0, "BRONZE"), (4, "BRONZE"), (5, "SILVER"), (19, "SILVER"), (20, "GOLD"), (50, "GOLD")],
+)
+def test_shipped_tiers(clean, tier):
+    assert _evaluator(SHIPPED, clean, overridden=3, other=2).evaluate("ACME") == (tier, clean)
+
+
+def test_ladder_ignores_yaml_order_and_ties_go_to_the_later_tier(tmp_path):
+    path = tmp_path / "trust.yaml"
+    path.write_text(
+        "tiers:\n"
+        "  GOLD: {min_clean_episodes: 20}\n"
+        "  SILVER: {min_clean_episodes: 5}\n"
+        "  PLATINUM: {min_clean_episodes: 20}\n"
+        "  BRONZE: {min_clean_episodes: 0}\n"
+    )
+    assert _evaluator(str(path), 25).evaluate("ACME") == ("PLATINUM", 25)
+    assert _evaluator(str(path), 7).evaluate("ACME") == ("SILVER", 7)
+    assert _evaluator(str(path), 0).evaluate("ACME") == ("BRONZE", 0)
+
+
+def test_missing_config_falls_back_to_bronze(tmp_path):
+    assert _evaluator(str(tmp_path / "missing.yaml"), 30).evaluate("ACME") == ("BRONZE", 30)